@@ -1,30 +1,95 @@
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 
-from app.schemas.product import StoreDetails
+from app.core.response_cache import full_response_cache, product_response_cache, stores_response_cache
+from app.schemas.product import (
+    OfferChangesResponse,
+    ProductBatchRequest,
+    ProductBatchResponse,
+    ProductFullResponse,
+    StoreDetails,
+)
+from app.services.cache_warmer import cache_warmer
 from app.services.product_service import ProductSearchService
 
 router = APIRouter()
 
 
 @router.get("/product/{product_id}")
-async def get_product(product_id: int, service: ProductSearchService = Depends()):
+async def get_product(
+        product_id: int, request: Request, response: Response, service: ProductSearchService = Depends()
+):
     """
     Endpoint para buscar os detalhes de um produto.
     Primeiro verifica o cache, caso não encontre, faz o scraping.
     """
-    product_info = await service.get_product_details(product_id)
-    if not product_info:
+    cache_warmer.record_product("product", product_id)
+    cached = await product_response_cache.get_or_load(product_id, lambda: service.get_product_details(product_id))
+    if not cached.data:
         raise HTTPException(status_code=404, detail="Produto não encontrado")
-    return product_info
+
+    not_modified = product_response_cache.conditional_response(request, response, cached)
+    if not_modified:
+        return not_modified
+    return cached.data
 
 @router.get("/product/{product_id}/stores", response_model=List[StoreDetails])
-async def get_product_stores(product_id: int, service: ProductSearchService = Depends()):
+async def get_product_stores(
+        product_id: int, request: Request, response: Response, service: ProductSearchService = Depends()
+):
     """
     Endpoint para buscar as demais comparações de preço do produto em outras lojas.
     """
-    product_offers = await service.get_product_offers(product_id)
-    if not product_offers:
+    cache_warmer.record_product("stores", product_id)
+    cached = await stores_response_cache.get_or_load(product_id, lambda: service.get_product_offers(product_id))
+    if not cached.data:
         raise HTTPException(status_code=404, detail="Comparações dos produtos não encontrados")
-    return [StoreDetails(**offer) for offer in product_offers]
+
+    not_modified = stores_response_cache.conditional_response(request, response, cached)
+    if not_modified:
+        return not_modified
+    return [StoreDetails(**offer) for offer in cached.data]
+
+
+@router.get("/product/{product_id}/full", response_model=ProductFullResponse)
+async def get_product_full(
+        product_id: int, request: Request, response: Response, service: ProductSearchService = Depends()
+):
+    """
+    Endpoint para buscar detalhes e ofertas do produto de uma só vez, baixando a página do produto uma única vez.
+    """
+    cache_warmer.record_product("full", product_id)
+    cached = await full_response_cache.get_or_load(product_id, lambda: service.get_product_full(product_id))
+    if not cached.data:
+        raise HTTPException(status_code=404, detail="Produto não encontrado")
+
+    not_modified = full_response_cache.conditional_response(request, response, cached)
+    if not_modified:
+        return not_modified
+    return ProductFullResponse(**cached.data)
+
+
+@router.post("/products/batch", response_model=ProductBatchResponse)
+async def get_products_batch(payload: ProductBatchRequest, service: ProductSearchService = Depends()):
+    """
+    Endpoint para buscar detalhes e/ou ofertas de vários produtos em uma única chamada.
+    Cada ID recebe seu próprio resultado; IDs que falharem trazem o campo `error`.
+    """
+    results = await service.get_products_batch(payload.ids, payload.fields)
+    return {"results": results}
+
+
+@router.get("/product/{product_id}/stores/changes", response_model=OfferChangesResponse)
+async def get_product_stores_changes(
+        product_id: int,
+        since: Optional[datetime] = Query(None, description="Retorna as mudanças registradas após esta data/hora."),
+        version: Optional[int] = Query(None, description="Retorna as mudanças após este token de versão."),
+        service: ProductSearchService = Depends(),
+):
+    """
+    Endpoint para buscar as mudanças de preço/ofertas do produto desde uma data ou versão, a partir do histórico
+    local, sem fazer scraping. Use o `version` retornado na próxima chamada para receber apenas as novidades.
+    """
+    return await service.get_offer_changes(product_id, since=since, version=version)
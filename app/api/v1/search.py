@@ -1,19 +1,94 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
+from typing import Literal, Optional
 
-from app.schemas.product import ProductSearchResponse, ProductSummary
+import httpx
+import orjson
+from fastapi import APIRouter, HTTPException, Query, Depends, Request, Response
+from fastapi.responses import StreamingResponse
+
+from app.core.logs import logger
+from app.core.response_cache import normalize_term, search_cache_key, search_response_cache
+from app.schemas.product import ProductSearchResponse, ProductSummary, SearchStreamSummary
+from app.services.cache_warmer import cache_warmer
 from app.services.search_service import SearchService
+from app.utils.rate_limiter import CircuitOpenError
 
 router = APIRouter()
 
 
+def search_options(
+        page: Optional[int] = Query(None, ge=1, description="Busca apenas esta página."),
+        limit: Optional[int] = Query(None, ge=1, description="Número máximo de produtos retornados."),
+        sort_by: str = Query("default", description="Ordenação repassada ao Zoom (sortBy)."),
+        hits_per_page: int = Query(48, ge=1, le=96, description="Produtos por página no Zoom (hitsPerPage)."),
+) -> dict:
+    return {"page": page, "limit": limit, "sort_by": sort_by, "hits_per_page": hits_per_page}
+
+
 @router.get("/search", response_model=ProductSearchResponse)
-async def search_products(q: str = Query(..., alias="term"), service: SearchService = Depends()):
+async def search_products(
+        request: Request,
+        response: Response,
+        q: str = Query(..., alias="term"),
+        options: dict = Depends(search_options),
+        service: SearchService = Depends(),
+):
+    term = normalize_term(q)
+    cache_warmer.record_search(term, options)
     try:
-        products = await service.search_products(query=q)
+        cached = await search_response_cache.get_or_load(
+            search_cache_key(term, options), lambda: service.search_products(query=term, **options)
+        )
+        not_modified = search_response_cache.conditional_response(request, response, cached)
+        if not_modified:
+            return not_modified
+
+        products = cached.data
         return {
             "total_pages": products["total_pages"],
             "total_products": products["total_products"],
             "products": [ProductSummary(**p) for p in products["products"]],
         }
+    except (CircuitOpenError, httpx.HTTPStatusError):
+        # Respondidos pelos handlers de app.main com 503/502.
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/search/stream")
+async def stream_search_products(
+        q: str = Query(..., alias="term"),
+        output_format: Literal["ndjson", "sse"] = Query("ndjson", alias="format"),
+        options: dict = Depends(search_options),
+        service: SearchService = Depends(),
+):
+    """
+    Versão em streaming da busca: emite cada produto (`ProductSummary`) assim que a página dele é parseada, seguido de
+    um registro final com `total_pages` e `total_products`. Em caso de falha no meio da busca, emite um registro
+    com `error`.
+    """
+    term = normalize_term(q)
+
+    def encode(event: str, payload: dict) -> bytes:
+        data = orjson.dumps(payload)
+        if output_format == "sse":
+            return b"event: " + event.encode() + b"\ndata: " + data + b"\n\n"
+        return data + b"\n"
+
+    async def records():
+        total_pages = 0
+        total_products = 0
+        try:
+            async for page_products in service.stream_products(query=term, **options):
+                total_pages += 1
+                for product in page_products:
+                    total_products += 1
+                    yield encode("product", ProductSummary(**product).model_dump())
+        except Exception as e:
+            logger.error("Streaming search failed for query %s: %s", term, e)
+            yield encode("error", {"error": str(e)})
+            return
+        yield encode("summary", SearchStreamSummary(total_pages=total_pages, total_products=total_products).model_dump())
+
+    media_type = "text/event-stream" if output_format == "sse" else "application/x-ndjson"
+    return StreamingResponse(records(), media_type=media_type)
@@ -1,47 +1,209 @@
+import asyncio
+import time
+import uuid
+
+import orjson
+from cachetools import TLRUCache
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.redis import RedisBackend
 from redis import asyncio as aioredis
+from redis.exceptions import ConnectionError as RedisConnectionError
 
 from app.core.config import settings
+from app.core.logs import logger
+from app.core.metrics import CACHE_LOOKUPS, REDIS_SECONDS
+from app.core.serializers import UnsupportedFormatError, serializer
+
+
+class LocalCache:
+    """
+    Cache L1 em memória do processo, limitado por número de entradas e por bytes, com TTL por entrada.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._cache = TLRUCache(
+            maxsize=max_bytes,
+            ttu=lambda _key, item, _now: item[1],
+            timer=time.monotonic,
+            getsizeof=lambda item: len(item[0]),
+        )
+
+    def get(self, key: str):
+        item = self._cache.get(key)
+        if item is None:
+            self.misses += 1
+            CACHE_LOOKUPS.labels("l1", "miss").inc()
+            return None
+        self.hits += 1
+        CACHE_LOOKUPS.labels("l1", "hit").inc()
+        return item[0]
+
+    def set(self, key: str, value: bytes, expire: int = None):
+        if len(value) > self.max_bytes:
+            return
+        ttl = min(self.ttl, expire) if expire else self.ttl
+        self._cache.pop(key, None)
+        while len(self._cache) >= self.max_entries:
+            self._cache.popitem()
+        self._cache[key] = (value, time.monotonic() + ttl)
+
+    def pop(self, key: str):
+        self._cache.pop(key, None)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._cache), "bytes": self._cache.currsize}
 
 
 class CacheManager:
-    def __init__(self, host: str, port: int, db: int, prefix_redis: str):
+    def __init__(self, host: str, port: int, db: int, prefix_redis: str, local_cache: LocalCache = None):
         self.host = host
         self.port = port
         self.db = db
         self.prefix_redis = prefix_redis
         self.redis_client = None
+        self.local_cache = local_cache
+        self.invalidation_channel = f"{prefix_redis}:invalidate"
+        self._instance_id = uuid.uuid4().hex
+        self._invalidation_task = None
 
     async def init_cache(self):
         """
         Initialize the Redis cache.
+        With the L1 cache enabled, also subscribe to the invalidations published by the other workers.
         """
         self.redis_client = aioredis.Redis(host=self.host, port=self.port, db=self.db)
         FastAPICache.init(RedisBackend(self.redis_client), prefix=self.prefix_redis)
+        if self.local_cache is not None:
+            self._invalidation_task = asyncio.create_task(self._listen_invalidations())
 
-    @classmethod
-    async def close_cache(cls):
+    async def close_cache(self):
+        if self._invalidation_task is not None:
+            self._invalidation_task.cancel()
+            self._invalidation_task = None
         backend = FastAPICache.get_backend()
         if isinstance(backend, RedisBackend):
             redis = backend.redis
             await redis.close()
 
-    @classmethod
-    async def set_cache_value(cls, key: str, value: bytes, expire: int = None):
+    async def _listen_invalidations(self):
+        pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self.invalidation_channel)
+        try:
+            while True:
+                try:
+                    async for message in pubsub.listen():
+                        sender, *keys = orjson.loads(message["data"])
+                        if sender != self._instance_id:
+                            for key in keys:
+                                self.local_cache.pop(key)
+                except RedisConnectionError as e:
+                    logger.warning("Cache invalidation listener disconnected: %s", e)
+                    await asyncio.sleep(1)
+        finally:
+            await pubsub.close()
+
+    def invalidation_message(self, keys: list) -> bytes:
+        return orjson.dumps([self._instance_id, *keys])
+
+    async def set_cache_value(self, key: str, value: bytes, expire: int = None):
         """
         Set a value in the Redis cache.
+        The L1 copies of the other workers are invalidated in the same round trip.
         """
-        backend = FastAPICache.get_backend()
-        await backend.set(key, value, expire=expire)
+        if self.local_cache is None:
+            backend = FastAPICache.get_backend()
+            with REDIS_SECONDS.labels("set").time():
+                await backend.set(key, value, expire=expire)
+            return
+
+        key, value = str(key), to_bytes(value)
+        with REDIS_SECONDS.labels("set").time():
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.set(key, value, ex=expire)
+                pipe.publish(self.invalidation_channel, self.invalidation_message([key]))
+                await pipe.execute()
+        self.local_cache.set(key, value, expire)
+
+    async def get_cache_value(self, key: str):
+        """
+        Get a value from the cache, trying the in-process L1 before Redis.
+        """
+        if self.local_cache is None:
+            backend = FastAPICache.get_backend()
+            with REDIS_SECONDS.labels("get").time():
+                return await backend.get(key)
+
+        key = str(key)
+        value = self.local_cache.get(key)
+        if value is not None:
+            return value
+
+        with REDIS_SECONDS.labels("get").time():
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.get(key)
+                pipe.ttl(key)
+                value, ttl = await pipe.execute()
+        if value is not None:
+            self.local_cache.set(key, value, ttl if ttl > 0 else None)
+        return value
+
+    async def set_object_value(self, key: str, value, expire: int = None):
+        """
+        Serialize a value with the versioned cache serializer and set it in the cache.
+        """
+        await self.set_cache_value(key, serializer.dumps(value), expire=expire)
 
-    @classmethod
-    async def get_cache_value(cls, key: str):
+    async def get_object_value(self, key: str):
         """
-        Get a value from the Redis cache.
+        Get a value written by set_object_value, or None when the key is missing.
+        Entries in a format version this worker does not know (written by a newer deploy) are treated as misses.
         """
+        raw = await self.get_cache_value(key)
+        if not raw:
+            return None
+        try:
+            return serializer.loads(raw)
+        except UnsupportedFormatError as e:
+            logger.debug("Ignoring cache entry %s: %s", key, e)
+            return None
+
+    async def get_cache_values(self, keys: list) -> list:
+        """
+        Get several values with a single MGET, in the same order as keys.
+        Keys already in the L1 cache are not requested from Redis; the fetched ones enter L1 capped at their Redis
+        TTL, read in the same round trip.
+        """
+        if not keys:
+            return []
         backend = FastAPICache.get_backend()
-        return await backend.get(key)
+        if self.local_cache is None:
+            with REDIS_SECONDS.labels("mget").time():
+                return await backend.redis.mget(keys)
+
+        keys = [str(key) for key in keys]
+        values = [self.local_cache.get(key) for key in keys]
+        missing = [index for index, value in enumerate(values) if value is None]
+        if missing:
+            with REDIS_SECONDS.labels("mget").time():
+                async with backend.redis.pipeline(transaction=False) as pipe:
+                    pipe.mget([keys[index] for index in missing])
+                    for index in missing:
+                        pipe.ttl(keys[index])
+                    fetched, *ttls = await pipe.execute()
+            for index, value, ttl in zip(missing, fetched, ttls):
+                values[index] = value
+                if value is not None:
+                    self.local_cache.set(keys[index], value, ttl if ttl > 0 else None)
+        return values
+
+
+def to_bytes(value) -> bytes:
+    return value if isinstance(value, bytes) else str(value).encode("utf-8")
 
 
 cache_manager = CacheManager(
@@ -49,4 +211,9 @@ cache_manager = CacheManager(
     port=settings.redis_port,
     db=settings.redis_db,
     prefix_redis=settings.redis_prefix,
+    local_cache=LocalCache(
+        max_entries=settings.l1_cache_max_entries,
+        max_bytes=settings.l1_cache_max_bytes,
+        ttl=settings.l1_cache_ttl,
+    ) if settings.l1_cache_enabled else None,
 )
@@ -11,11 +11,75 @@ class Settings(BaseSettings):
     app_name: str = "FastAPI Application"
     app_description: str = "A FastAPI application with a modular structure."
     app_version: str = "1.0.0"
+    server_host: str = os.getenv("SERVER_HOST", "0.0.0.0")
+    server_port: int = os.getenv("SERVER_PORT", 8000)
+    server_workers: int = os.getenv("SERVER_WORKERS", 0)
+    server_backlog: int = os.getenv("SERVER_BACKLOG", 2048)
+    server_graceful_timeout: int = os.getenv("SERVER_GRACEFUL_TIMEOUT", 30)
+    log_level: str = os.getenv("LOG_LEVEL", "INFO")
+    log_format: str = os.getenv("LOG_FORMAT", "text")
+    log_file: str = os.getenv("LOG_FILE", "app.log")
+    log_sample_rate: float = os.getenv("LOG_SAMPLE_RATE", 1.0)
     base_url: str = os.getenv("BASE_URL")
     redis_host: str = os.getenv("REDIS_HOST")
     redis_port: int = os.getenv("REDIS_PORT", 6379)
     redis_db: int = os.getenv("REDIS_DB", 0)
     redis_prefix: str = os.getenv("REDIS_PREFIX")
+    cache_compress_threshold: int = os.getenv("CACHE_COMPRESS_THRESHOLD", 1024)
+    cache_compress_level: int = os.getenv("CACHE_COMPRESS_LEVEL", 6)
+    l1_cache_enabled: bool = os.getenv("L1_CACHE_ENABLED", True)
+    l1_cache_max_entries: int = os.getenv("L1_CACHE_MAX_ENTRIES", 10000)
+    l1_cache_max_bytes: int = os.getenv("L1_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+    l1_cache_ttl: int = os.getenv("L1_CACHE_TTL", 60)
+    parser_engine: str = os.getenv("PARSER_ENGINE", "html.parser")
+    parser_embedded_json: bool = os.getenv("PARSER_EMBEDDED_JSON", False)
+    parser_pool_kind: str = os.getenv("PARSER_POOL_KIND", "process")
+    parser_pool_workers: int = os.getenv("PARSER_POOL_WORKERS", 0)
+    database_url: str = os.getenv("DATABASE_URL", "sqlite:///price_history.db")
+    search_max_concurrency: int = os.getenv("SEARCH_MAX_CONCURRENCY", 8)
+    http_max_connections: int = os.getenv("HTTP_MAX_CONNECTIONS", 100)
+    http_max_keepalive_connections: int = os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", 20)
+    http_keepalive_expiry: float = os.getenv("HTTP_KEEPALIVE_EXPIRY", 30.0)
+    http_http2: bool = os.getenv("HTTP_HTTP2", False)
+    http_timeout: float = os.getenv("HTTP_TIMEOUT", 10.0)
+    http_retries: int = os.getenv("HTTP_RETRIES", 3)
+    http_backoff: float = os.getenv("HTTP_BACKOFF", 0.5)
+    http_max_connections_per_host: int = os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", 16)
+    rate_limit_initial: float = os.getenv("RATE_LIMIT_INITIAL", 10.0)
+    rate_limit_min: float = os.getenv("RATE_LIMIT_MIN", 1.0)
+    rate_limit_max: float = os.getenv("RATE_LIMIT_MAX", 50.0)
+    rate_limit_burst: int = os.getenv("RATE_LIMIT_BURST", 20)
+    rate_limit_increase: float = os.getenv("RATE_LIMIT_INCREASE", 0.5)
+    rate_limit_increase_every: int = os.getenv("RATE_LIMIT_INCREASE_EVERY", 10)
+    circuit_failure_threshold: int = os.getenv("CIRCUIT_FAILURE_THRESHOLD", 5)
+    circuit_reset_timeout: float = os.getenv("CIRCUIT_RESET_TIMEOUT", 30.0)
+    search_cache_ttl: int = os.getenv("SEARCH_CACHE_TTL", 600)
+    product_cache_ttl: int = os.getenv("PRODUCT_CACHE_TTL", 3600)
+    stores_cache_ttl: int = os.getenv("STORES_CACHE_TTL", 300)
+    response_cache_grace: int = os.getenv("RESPONSE_CACHE_GRACE", 300)
+    response_cache_stale_if_error: int = os.getenv("RESPONSE_CACHE_STALE_IF_ERROR", 3600)
+    product_url_fallback: str = os.getenv("PRODUCT_URL_FALLBACK", "")
+    product_page_cache_ttl: int = os.getenv("PRODUCT_PAGE_CACHE_TTL", 120)
+    upstream_cache_ttl: int = os.getenv("UPSTREAM_CACHE_TTL", 86400)
+    upstream_cache_max_bytes: int = os.getenv("UPSTREAM_CACHE_MAX_BYTES", 2 * 1024 * 1024)
+    parse_memo_ttl: int = os.getenv("PARSE_MEMO_TTL", 86400)
+    batch_max_ids: int = os.getenv("BATCH_MAX_IDS", 500)
+    batch_max_concurrency: int = os.getenv("BATCH_MAX_CONCURRENCY", 16)
+    cache_warmer_mode: str = os.getenv("CACHE_WARMER_MODE", "off")
+    cache_warmer_interval: int = os.getenv("CACHE_WARMER_INTERVAL", 60)
+    cache_warmer_top_terms: int = os.getenv("CACHE_WARMER_TOP_TERMS", 50)
+    cache_warmer_top_products: int = os.getenv("CACHE_WARMER_TOP_PRODUCTS", 200)
+    cache_warmer_request_budget: int = os.getenv("CACHE_WARMER_REQUEST_BUDGET", 500)
+    cache_warmer_lead: int = os.getenv("CACHE_WARMER_LEAD", 120)
+    singleflight_lock_ttl: int = os.getenv("SINGLEFLIGHT_LOCK_TTL", 60)
+    singleflight_result_ttl: int = os.getenv("SINGLEFLIGHT_RESULT_TTL", 10)
+    singleflight_poll_interval: float = os.getenv("SINGLEFLIGHT_POLL_INTERVAL", 0.1)
+    tracing_enabled: bool = os.getenv("TRACING_ENABLED", False)
+
+    @property
+    def server_worker_count(self) -> int:
+        """Number of API worker processes; SERVER_WORKERS=0 means one per CPU."""
+        return self.server_workers or os.cpu_count() or 1
 
     model_config = SettingsConfigDict(case_sensitive=True, env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
@@ -0,0 +1,47 @@
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import DatabaseError
+from sqlalchemy.orm import DeclarativeBase, sessionmaker
+
+from app.core.config import settings
+
+engine = create_engine(
+    settings.database_url,
+    connect_args={"check_same_thread": False} if settings.database_url.startswith("sqlite") else {},
+)
+SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
+
+
+@event.listens_for(engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, _):
+    """
+    WAL permite leituras concorrentes com a escrita e busy_timeout evita falhas quando vários workers gravam juntos.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+def init_db():
+    """
+    Create the tables that do not exist yet.
+    Safe to run from several workers at once: app.server runs it once before starting them, and a worker that races
+    another one on a fresh database retries, creating only the tables still missing.
+    """
+    import app.models.offer  # noqa: F401  (registers the models in Base.metadata)
+
+    # Each collision means another worker created one more table or index, so this converges within one pass each.
+    passes = sum(1 + len(table.indexes) for table in Base.metadata.tables.values()) + 1
+    for attempt in range(passes):
+        try:
+            Base.metadata.create_all(engine)
+            return
+        except DatabaseError as e:
+            if "already exists" not in str(e) or attempt == passes - 1:
+                raise
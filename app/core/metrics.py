@@ -0,0 +1,67 @@
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Com vários workers do uvicorn, defina PROMETHEUS_MULTIPROC_DIR (um diretório vazio a cada deploy) para que o
+# /metrics de qualquer worker agregue as métricas de todos.
+
+UPSTREAM_FETCH_SECONDS = Histogram(
+    "zoom_upstream_fetch_seconds",
+    "Latency of each HTTP request to the upstream, by host and response status.",
+    ["host", "status"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 16),
+)
+
+PARSE_SECONDS = Histogram(
+    "zoom_parse_seconds",
+    "Time spent parsing a page, including the wait for a parser pool worker, by parse function.",
+    ["parser"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2),
+)
+
+REDIS_SECONDS = Histogram(
+    "zoom_redis_op_seconds",
+    "Latency of the cache operations sent to Redis, by operation.",
+    ["op"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+
+CACHE_LOOKUPS = Counter(
+    "zoom_cache_lookups",
+    "Cache lookups by cache layer and result (hit, stale, miss, not_modified, modified).",
+    ["layer", "result"],
+)
+
+SEARCH_PAGES = Histogram(
+    "zoom_search_pages",
+    "Result pages yielded per search.",
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55),
+)
+
+SCRAPES_IN_FLIGHT = Gauge(
+    "zoom_scrapes_in_flight",
+    "Scrapes currently running (coalesced callers count once), by scraper type.",
+    ["scraper"],
+    multiprocess_mode="livesum",
+)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """
+    Render every metric in the Prometheus text format, aggregating all workers in multiprocess mode.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,64 @@
+from app.core.cache import cache_manager
+from app.core.config import settings
+
+
+class ProductIndex:
+    """
+    Índice durável de ID do produto -> URL de detalhe, guardado em um hash do Redis sem expiração.
+    Atualizado a cada busca; as leituras passam pelo cache L1 do CacheManager, quando habilitado.
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+
+    def _local_key(self, product_id) -> str:
+        return f"{self.key}:{product_id}"
+
+    async def upsert(self, mapping: dict):
+        """
+        Insert or update several id -> detail_url entries with a single HSET.
+        The L1 copies of the other workers are invalidated in the same round trip.
+        """
+        mapping = {str(product_id): url for product_id, url in mapping.items() if product_id and url}
+        if not mapping:
+            return
+        local_cache = cache_manager.local_cache
+        if local_cache is None:
+            await cache_manager.redis_client.hset(self.key, mapping=mapping)
+            return
+
+        # Os outros workers descartam suas cópias L1 das URLs alteradas, pelo mesmo canal do CacheManager.
+        local_keys = [self._local_key(product_id) for product_id in mapping]
+        async with cache_manager.redis_client.pipeline(transaction=False) as pipe:
+            pipe.hset(self.key, mapping=mapping)
+            pipe.publish(cache_manager.invalidation_channel, cache_manager.invalidation_message(local_keys))
+            await pipe.execute()
+        for local_key, url in zip(local_keys, mapping.values()):
+            local_cache.set(local_key, url.encode("utf-8"))
+
+    async def get(self, product_id) -> str | None:
+        """
+        Get the detail URL of a product, or None when it was never indexed.
+        """
+        return (await self.get_many([product_id]))[0]
+
+    async def get_many(self, product_ids: list) -> list[str | None]:
+        """
+        Get the detail URLs of several products with a single HMGET, in the same order as product_ids.
+        """
+        if not product_ids:
+            return []
+
+        local_cache = cache_manager.local_cache
+        urls = [local_cache.get(self._local_key(product_id)) if local_cache else None for product_id in product_ids]
+        missing = [index for index, url in enumerate(urls) if url is None]
+        if missing:
+            fetched = await cache_manager.redis_client.hmget(self.key, [str(product_ids[index]) for index in missing])
+            for index, url in zip(missing, fetched):
+                urls[index] = url
+                if url is not None and local_cache is not None:
+                    local_cache.set(self._local_key(product_ids[index]), url)
+        return [url.decode("utf-8") if url is not None else None for url in urls]
+
+
+product_index = ProductIndex(f"{settings.redis_prefix}:product_urls")
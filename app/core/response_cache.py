@@ -0,0 +1,172 @@
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+import orjson
+from fastapi import Request, Response
+
+from app.core.cache import cache_manager
+from app.core.config import settings
+from app.core.logs import logger
+from app.core.metrics import CACHE_LOOKUPS
+
+
+@dataclass
+class CachedResponse:
+    data: Any
+    etag: Optional[str]
+    age: float = 0.0
+
+
+class ResponseCache:
+    """
+    Cache de respostas completas (resultado já parseado) com stale-while-revalidate.
+
+    Uma entrada é servida normalmente até `ttl` segundos; durante os `grace` segundos seguintes ela ainda é
+    servida, mas uma tarefa em segundo plano refaz o scraping e atualiza o cache. Depois disso ela ainda é mantida
+    por `stale_if_error` segundos, sendo servida apenas se o novo scraping falhar.
+    """
+
+    def __init__(self, namespace: str, ttl: int, grace: int, stale_if_error: int):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.grace = grace
+        self.stale_if_error = stale_if_error
+        self.layer = f"response_{namespace}"
+        self._refreshing: dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def key(self, identifier) -> str:
+        return f"{settings.redis_prefix}:response:{self.namespace}:{identifier}"
+
+    async def get_or_load(self, identifier, loader: Callable[[], Awaitable[Any]]) -> CachedResponse:
+        """
+        Return the cached result for identifier, calling loader on a miss.
+        Empty results are returned but not stored, so a later request retries the scrape.
+        """
+        key = self.key(identifier)
+        entry = await cache_manager.get_object_value(key)
+        if entry:
+            age = time.time() - entry["stored_at"]
+            if age < self.ttl:
+                self.hits += 1
+                CACHE_LOOKUPS.labels(self.layer, "hit").inc()
+                return CachedResponse(entry["data"], entry["etag"], age)
+            if age < self.ttl + self.grace:
+                self.stale_hits += 1
+                CACHE_LOOKUPS.labels(self.layer, "stale").inc()
+                self._schedule_refresh(key, loader)
+                return CachedResponse(entry["data"], entry["etag"], age)
+
+        self.misses += 1
+        CACHE_LOOKUPS.labels(self.layer, "miss").inc()
+        try:
+            return await self._load(key, loader)
+        except Exception as e:
+            if not entry:
+                raise
+            # Upstream indisponível (ex.: circuito aberto): serve a última versão conhecida.
+            logger.warning("Serving stale %s after upstream error: %s", key, e)
+            return CachedResponse(entry["data"], entry["etag"], time.time() - entry["stored_at"])
+
+    async def refresh_if_expiring(
+            self, identifier, loader: Callable[[], Awaitable[Any]], lead: int
+    ) -> Optional[CachedResponse]:
+        """
+        Reload the entry when it is missing or will go stale within lead seconds.
+        Returns the reloaded result, or None when the entry was still fresh.
+        """
+        key = self.key(identifier)
+        entry = await cache_manager.get_object_value(key)
+        if entry and time.time() - entry["stored_at"] < self.ttl - lead:
+            return None
+        return await self._load(key, loader)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "stale_hits": self.stale_hits, "misses": self.misses}
+
+    def pending(self) -> list[asyncio.Task]:
+        """Background refreshes still running."""
+        return list(self._refreshing.values())
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> CachedResponse:
+        data = await loader()
+        if not data:
+            return CachedResponse(data, None)
+
+        etag = make_etag(data)
+        await cache_manager.set_object_value(
+            key, {"data": data, "etag": etag, "stored_at": time.time()},
+            expire=self.ttl + self.grace + self.stale_if_error,
+        )
+        return CachedResponse(data, etag)
+
+    def _schedule_refresh(self, key: str, loader: Callable[[], Awaitable[Any]]):
+        if key in self._refreshing:
+            return
+        task = asyncio.create_task(self._load(key, loader))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda done: self._refresh_done(key, done))
+
+    def _refresh_done(self, key: str, task: asyncio.Task):
+        self._refreshing.pop(key, None)
+        if not task.cancelled() and task.exception():
+            logger.warning("Background refresh failed for %s: %s", key, task.exception())
+
+    def conditional_response(self, request: Request, response: Response, cached: CachedResponse) -> Optional[Response]:
+        """
+        Set ETag/Cache-Control headers on response.
+        Returns a 304 response when the client's If-None-Match already matches the cached entry.
+        """
+        if not cached.etag:
+            return None
+
+        headers = {
+            "ETag": cached.etag,
+            "Cache-Control": f"public, max-age={max(int(self.ttl - cached.age), 0)}, "
+                             f"stale-while-revalidate={self.grace}, stale-if-error={self.stale_if_error}",
+        }
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            candidates = {tag.strip() for tag in if_none_match.split(",")}
+            if "*" in candidates or cached.etag in candidates:
+                return Response(status_code=304, headers=headers)
+
+        response.headers.update(headers)
+        return None
+
+
+def make_etag(data) -> str:
+    return f'W/"{hashlib.sha1(orjson.dumps(data, option=orjson.OPT_SORT_KEYS)).hexdigest()}"'
+
+
+def normalize_term(term: str) -> str:
+    return " ".join(term.lower().split())
+
+
+def search_cache_key(term: str, options: dict) -> str:
+    return ":".join([term, *(f"{k}={v}" for k, v in options.items())])
+
+
+search_response_cache = ResponseCache(
+    "search", ttl=settings.search_cache_ttl, grace=settings.response_cache_grace,
+    stale_if_error=settings.response_cache_stale_if_error,
+)
+product_response_cache = ResponseCache(
+    "product", ttl=settings.product_cache_ttl, grace=settings.response_cache_grace,
+    stale_if_error=settings.response_cache_stale_if_error,
+)
+stores_response_cache = ResponseCache(
+    "stores", ttl=settings.stores_cache_ttl, grace=settings.response_cache_grace,
+    stale_if_error=settings.response_cache_stale_if_error,
+)
+full_response_cache = ResponseCache(
+    "full", ttl=settings.stores_cache_ttl, grace=settings.response_cache_grace,
+    stale_if_error=settings.response_cache_stale_if_error,
+)
+
+RESPONSE_CACHES = (search_response_cache, product_response_cache, stores_response_cache, full_response_cache)
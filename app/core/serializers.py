@@ -0,0 +1,53 @@
+import zlib
+
+import orjson
+
+from app.core.config import settings
+
+
+class UnsupportedFormatError(ValueError):
+    """A cache entry written in a format version this worker does not know (e.g. by a newer deploy)."""
+
+
+class CacheSerializer:
+    """
+    Serializa objetos para o cache em um formato binário versionado.
+
+    Cada entrada começa com um cabeçalho de 4 bytes: MAGIC (2 bytes), versão do formato e flags. O corpo é JSON
+    gerado pelo orjson, comprimido com zlib quando passa de `compress_threshold` bytes. Entradas sem o cabeçalho
+    (gravadas antes deste formato) são lidas como JSON puro.
+    """
+
+    MAGIC = b"\xffZ"
+    VERSION = 1
+    FLAG_ZLIB = 0x01
+
+    def __init__(self, compress_threshold: int, compress_level: int):
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+
+    def dumps(self, value) -> bytes:
+        payload = orjson.dumps(value)
+        flags = 0
+        if len(payload) > self.compress_threshold:
+            payload = zlib.compress(payload, self.compress_level)
+            flags |= self.FLAG_ZLIB
+        return self.MAGIC + bytes((self.VERSION, flags)) + payload
+
+    def loads(self, data: bytes):
+        if not data.startswith(self.MAGIC):
+            return orjson.loads(data)
+
+        version, flags = data[2], data[3]
+        if version != self.VERSION:
+            raise UnsupportedFormatError(f"Unsupported cache entry format version {version}.")
+        payload = data[4:]
+        if flags & self.FLAG_ZLIB:
+            payload = zlib.decompress(payload)
+        return orjson.loads(payload)
+
+
+serializer = CacheSerializer(
+    compress_threshold=settings.cache_compress_threshold,
+    compress_level=settings.cache_compress_level,
+)
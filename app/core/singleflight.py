@@ -0,0 +1,93 @@
+import asyncio
+import uuid
+from typing import Any, Awaitable, Callable
+
+from app.core.cache import cache_manager
+from app.core.config import settings
+from app.core.serializers import UnsupportedFormatError, serializer
+
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """
+    Coalesce chamadas idênticas em andamento em uma única execução.
+
+    Dentro do processo, chamadas com a mesma chave aguardam a mesma task. Entre workers, apenas quem obtém o lock
+    no Redis executa; os demais aguardam o resultado publicado pelo líder.
+    """
+
+    def __init__(self, lock_ttl: int, result_ttl: int, poll_interval: float):
+        self.lock_ttl = lock_ttl
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]):
+        """
+        Run func once for every concurrent caller sharing key and return its result to all of them.
+        The shared task keeps running if one of the callers is cancelled.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run(key, func))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._done(key, done))
+        return await asyncio.shield(task)
+
+    def pending(self) -> list[asyncio.Task]:
+        return list(self._inflight.values())
+
+    def _done(self, key: str, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            # Marks the exception as retrieved when every caller was cancelled before the task finished.
+            task.exception()
+
+    async def _run(self, key: str, func: Callable[[], Awaitable[Any]]):
+        redis = cache_manager.redis_client
+        if redis is None:
+            return await func()
+
+        lock_key = f"{settings.redis_prefix}:singleflight:lock:{key}"
+        result_key = f"{settings.redis_prefix}:singleflight:result:{key}"
+        token = uuid.uuid4().hex
+
+        if await redis.set(lock_key, token, nx=True, ex=self.lock_ttl):
+            try:
+                result = await func()
+                await redis.set(result_key, serializer.dumps(result), ex=self.result_ttl)
+                return result
+            finally:
+                await redis.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.lock_ttl
+        while loop.time() < deadline:
+            # The leader publishes the result before releasing the lock, so check the lock first.
+            lock_held = await redis.exists(lock_key)
+            raw = await redis.get(result_key)
+            if raw is not None:
+                try:
+                    return serializer.loads(raw)
+                except UnsupportedFormatError:
+                    # Result published by a worker running a newer format: do the work here.
+                    break
+            if not lock_held:
+                break
+            await asyncio.sleep(self.poll_interval)
+
+        # The leader failed or timed out without publishing a result: do the work here.
+        return await func()
+
+
+single_flight = SingleFlight(
+    lock_ttl=settings.singleflight_lock_ttl,
+    result_ttl=settings.singleflight_result_ttl,
+    poll_interval=settings.singleflight_poll_interval,
+)
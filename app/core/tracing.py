@@ -0,0 +1,32 @@
+from contextlib import contextmanager
+from functools import lru_cache
+
+from app.core.config import settings
+
+
+@lru_cache
+def get_tracer():
+    """
+    Get the OpenTelemetry tracer, or None when tracing is disabled.
+    The exporter and the SDK are configured by the deployment (e.g. opentelemetry-instrument).
+    """
+    if not settings.tracing_enabled:
+        return None
+    try:
+        from opentelemetry import trace
+    except ImportError as e:
+        raise RuntimeError("TRACING_ENABLED requires the opentelemetry-api package.") from e
+    return trace.get_tracer("zoom_scraper_api")
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Open a span around a stage of the scrape; does nothing when tracing is disabled.
+    """
+    tracer = get_tracer()
+    if tracer is None:
+        yield None
+        return
+    with tracer.start_as_current_span(name, attributes=attributes) as current:
+        yield current
@@ -1,30 +1,86 @@
+import asyncio
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 
+import httpx
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 
 from app.api.api import api_router
 from app.core.cache import cache_manager
 from app.core.config import settings
-from app.core.logs import logger
+from app.core.database import init_db
+from app.core.logs import CorrelationIdMiddleware, logger
+from app.core.response_cache import RESPONSE_CACHES
+from app.core.singleflight import single_flight
+from app.scrapers.pool import parser_pool
+from app.services.cache_warmer import cache_warmer
+from app.utils.http_client import THROTTLE_STATUS_CODES, http_client, parse_retry_after
+from app.utils.rate_limiter import CircuitOpenError
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI) -> AsyncIterator[None]:
     logger.info("starting lifespan")
+    init_db()
     await cache_manager.init_cache()
+    await http_client.init_client()
+    await parser_pool.start()
+    cache_warmer.start()
     yield
+    await cache_warmer.stop()
+    await drain_scrapes(settings.server_graceful_timeout)
+    parser_pool.shutdown()
+    await http_client.close_client()
     await cache_manager.close_cache()
 
 
+async def drain_scrapes(timeout: float):
+    """
+    Wait for the scrapes still running after the last request (coalesced executions and background cache
+    refreshes) before the pools they use are closed; the ones that do not finish within timeout are cancelled.
+    """
+    tasks = [*single_flight.pending(), *(task for cache in RESPONSE_CACHES for task in cache.pending())]
+    if not tasks:
+        return
+    logger.info("Draining %s in-flight scrapes", len(tasks))
+    _, still_running = await asyncio.wait(tasks, timeout=timeout)
+    for task in still_running:
+        task.cancel()
+
+
 app = FastAPI(
     title=settings.app_name,
     description=settings.app_description,
     app_version=settings.app_version,
     lifespan=lifespan
 )
+app.add_middleware(CorrelationIdMiddleware)
 app.include_router(api_router)
 
+
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_handler(_: Request, exc: CircuitOpenError):
+    return JSONResponse(
+        status_code=503, content={"detail": str(exc)}, headers={"Retry-After": str(int(exc.retry_after))}
+    )
+
+
+@app.exception_handler(httpx.HTTPStatusError)
+async def upstream_status_handler(_: Request, exc: httpx.HTTPStatusError):
+    """
+    Upstream errors that outlasted the retries: throttling (429/503) becomes a 503 with the upstream's Retry-After
+    (or the circuit reset timeout); any other status is a 502.
+    """
+    status = exc.response.status_code
+    detail = f"Zoom respondeu {status} para {exc.request.url}"
+    if status in THROTTLE_STATUS_CODES:
+        retry_after = parse_retry_after(exc.response.headers.get("retry-after")) or settings.circuit_reset_timeout
+        return JSONResponse(
+            status_code=503, content={"detail": detail}, headers={"Retry-After": str(max(int(retry_after), 1))}
+        )
+    return JSONResponse(status_code=502, content={"detail": detail})
+
 if __name__ == "__main__":
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,41 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import BigInteger, DateTime, Float, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class OfferState(Base):
+    """Última oferta conhecida de cada loja para um produto, usada para detectar mudanças."""
+
+    __tablename__ = "offer_state"
+
+    product_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    store_name: Mapped[str] = mapped_column(String, primary_key=True)
+    price: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    purchase_link: Mapped[str] = mapped_column(String)
+
+
+class OfferChange(Base):
+    """
+    Uma mudança de oferta: loja nova ("added"), preço alterado ("changed") ou loja que saiu da lista ("removed").
+    O id, crescente, serve de token de versão para consultas incrementais.
+    """
+
+    __tablename__ = "offer_changes"
+    __table_args__ = (Index("ix_offer_changes_product_id_id", "product_id", "id"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    product_id: Mapped[int] = mapped_column(BigInteger)
+    store_name: Mapped[str] = mapped_column(String)
+    change_type: Mapped[str] = mapped_column(String(8))
+    price: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    previous_price: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    purchase_link: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    recorded_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utc_now, index=True)
@@ -1,6 +1,9 @@
-from typing import Optional, List
+from datetime import datetime
+from typing import Any, Dict, List, Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
 
 
 class ProductSummary(BaseModel):
@@ -8,7 +11,7 @@ class ProductSummary(BaseModel):
     name: str
     description: Optional[str] = None
     price: float
-    installments: str
+    installments: Optional[str] = None
     ratings: Optional[str] = None
     image_url: str
     detail_url: str
@@ -20,7 +23,49 @@ class ProductSearchResponse(BaseModel):
     products: List[ProductSummary]
 
 
+class SearchStreamSummary(BaseModel):
+    total_pages: int
+    total_products: int
+
+
 class StoreDetails(BaseModel):
     price: Optional[float] = None
     store_name: Optional[str] = None
     purchase_link: str
+
+
+class ProductFullResponse(BaseModel):
+    details: Optional[Dict[str, Any]] = None
+    offers: List[StoreDetails]
+
+
+class ProductBatchRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=settings.batch_max_ids)
+    fields: List[Literal["details", "offers"]] = Field(default=["details", "offers"], min_length=1)
+
+
+class ProductBatchItem(BaseModel):
+    id: int
+    details: Optional[Dict[str, Any]] = None
+    offers: Optional[List[StoreDetails]] = None
+    error: Optional[str] = None
+
+
+class ProductBatchResponse(BaseModel):
+    results: List[ProductBatchItem]
+
+
+class OfferChangeDetails(BaseModel):
+    version: int
+    store_name: str
+    change_type: Literal["added", "changed", "removed"]
+    price: Optional[float] = None
+    previous_price: Optional[float] = None
+    purchase_link: Optional[str] = None
+    recorded_at: datetime
+
+
+class OfferChangesResponse(BaseModel):
+    product_id: int
+    version: Optional[int] = None
+    changes: List[OfferChangeDetails]
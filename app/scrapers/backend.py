@@ -1,14 +1,50 @@
+import hashlib
+from typing import Any, Awaitable, Callable
+
 from app.core.cache import cache_manager
 from app.core.config import settings
+from app.core.metrics import SCRAPES_IN_FLIGHT
+from app.core.singleflight import single_flight
+from app.core.tracing import span
 from app.scrapers.factory import ScraperFactory
-from app.utils.http_client import fetch_url
+from app.utils.http_client import HTTPClient, http_client
 
 
 class ScraperBackend:
     BASE_URL = settings.base_url
 
-    def __init__(self, scraper_type: str):
+    def __init__(self, scraper_type: str, client: HTTPClient = http_client,
+                 on_result: Callable[[Any], Awaitable] = None):
+        self.scraper_type = scraper_type
         self.instance = ScraperFactory.create_scraper(scraper_type)
+        self.client = client
+        self.on_result = on_result
 
     async def execute(self, *args, **kwargs):
-        return await self.instance.execute(self.BASE_URL, *args, cache_manager=cache_manager, fetch_url=fetch_url)
+        """
+        Executa o scraper; chamadas concorrentes com os mesmos argumentos compartilham uma única execução.
+        `on_result` roda dentro dessa execução compartilhada, uma única vez por scraping, e não por chamador.
+        """
+        key = ":".join([self.scraper_type, *map(str, args), *(f"{k}={v}" for k, v in sorted(kwargs.items()))])
+        if len(key) > 200:
+            key = f"{self.scraper_type}:{hashlib.sha1(key.encode()).hexdigest()}"
+
+        async def run():
+            with SCRAPES_IN_FLIGHT.labels(self.scraper_type).track_inprogress(), span("scraper.run"):
+                result = await self.instance.execute(
+                    self.BASE_URL, *args, cache_manager=cache_manager, fetch_url=self.client.fetch_url, **kwargs
+                )
+                if self.on_result is not None:
+                    await self.on_result(result)
+                return result
+
+        with span("scraper.execute", scraper=self.scraper_type, key=key):
+            return await single_flight.do(key, run)
+
+    def stream(self, *args, **kwargs):
+        """
+        Gera os resultados do scraper incrementalmente (ex.: página a página na busca), sem coalescer chamadas.
+        """
+        return self.instance.iter_pages(
+            self.BASE_URL, *args, cache_manager=cache_manager, fetch_url=self.client.fetch_url, **kwargs
+        )
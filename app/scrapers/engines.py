@@ -0,0 +1,183 @@
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+import soupsieve
+from bs4 import BeautifulSoup, Tag
+
+from app.core.config import settings
+
+
+class ParserEngine(ABC):
+    """
+    Motor de parsing HTML usado pelos parsers.
+    Abstrai a construção da árvore e as consultas CSS para que o mesmo parser rode sobre bibliotecas diferentes.
+    """
+
+    @abstractmethod
+    def parse(self, html: str):
+        """Build the document tree for the HTML content."""
+        pass
+
+    # Whether FieldSpec should match the fields of a scope in one walk over its elements (cheap for trees of Python
+    # objects) rather than with one native query per field.
+    walk_fields = True
+
+    def compile(self, selector: str):
+        """Compile the CSS selector for select/select_one; engines without a compiled form use the string."""
+        return selector
+
+    @abstractmethod
+    def select(self, node, selector) -> list:
+        """Return every element under node matching the CSS selector (as a string or from compile)."""
+        pass
+
+    @abstractmethod
+    def select_one(self, node, selector):
+        """Return the first element under node matching the CSS selector (as a string or from compile), or None."""
+        pass
+
+    @abstractmethod
+    def elements(self, node):
+        """Iterate over the elements under node, in document order, excluding node itself."""
+        pass
+
+    @abstractmethod
+    def parent(self, node):
+        """Return the parent element of node, or None at the root."""
+        pass
+
+    @abstractmethod
+    def tag(self, node) -> str:
+        """Return the tag name of the element."""
+        pass
+
+    @abstractmethod
+    def classes(self, node) -> list:
+        """Return the class names of the element."""
+        pass
+
+    @abstractmethod
+    def text(self, node) -> str:
+        """Return the whole text content of node, stripped at both ends."""
+        pass
+
+    @abstractmethod
+    def joined_text(self, node) -> str:
+        """Return the text pieces of node, each one stripped, joined without separator."""
+        pass
+
+    @abstractmethod
+    def attr(self, node, name: str):
+        """Return the value of the attribute, or None when it is missing."""
+        pass
+
+
+class SoupEngine(ParserEngine):
+    """BeautifulSoup tree with soupsieve queries, built by the standard library html.parser."""
+
+    features = "html.parser"
+
+    def parse(self, html: str):
+        return BeautifulSoup(html, self.features)
+
+    def compile(self, selector: str):
+        return soupsieve.compile(selector)
+
+    def select(self, node, selector) -> list:
+        return soupsieve.select(selector, node)
+
+    def select_one(self, node, selector):
+        return soupsieve.select_one(selector, node)
+
+    def elements(self, node):
+        return (element for element in node.descendants if isinstance(element, Tag))
+
+    def parent(self, node):
+        return node.parent
+
+    def tag(self, node) -> str:
+        return node.name
+
+    def classes(self, node) -> list:
+        return node.attrs.get("class") or []
+
+    def text(self, node) -> str:
+        return node.text.strip()
+
+    def joined_text(self, node) -> str:
+        return node.get_text(strip=True)
+
+    def attr(self, node, name: str):
+        value = node.attrs.get(name)
+        # Multi-valued attributes (class, rel...) come as lists; CSS attribute selectors see them space-joined.
+        return " ".join(value) if isinstance(value, list) else value
+
+
+class LxmlSoupEngine(SoupEngine):
+    """Same BeautifulSoup tree, built by lxml's C parser."""
+
+    features = "lxml"
+
+
+class SelectolaxEngine(ParserEngine):
+    """Lexbor tree from selectolax, with native CSS queries."""
+
+    walk_fields = False
+
+    def __init__(self):
+        try:
+            from selectolax.lexbor import LexborHTMLParser
+        except ImportError as e:
+            raise RuntimeError("The 'selectolax' parser engine requires the selectolax package.") from e
+        self._parser_class = LexborHTMLParser
+
+    def parse(self, html: str):
+        return self._parser_class(html)
+
+    def select(self, node, selector) -> list:
+        return node.css(selector)
+
+    def select_one(self, node, selector):
+        return node.css_first(selector)
+
+    def elements(self, node):
+        elements = node.traverse(include_text=False)
+        next(elements, None)
+        return elements
+
+    def parent(self, node):
+        return node.parent
+
+    def tag(self, node) -> str:
+        return node.tag
+
+    def classes(self, node) -> list:
+        return (node.attributes.get("class") or "").split()
+
+    def text(self, node) -> str:
+        return node.text(deep=True).strip()
+
+    def joined_text(self, node) -> str:
+        return node.text(deep=True, separator="", strip=True)
+
+    def attr(self, node, name: str):
+        return node.attributes.get(name)
+
+
+ENGINES = {
+    "html.parser": SoupEngine,
+    "lxml": LxmlSoupEngine,
+    "selectolax": SelectolaxEngine,
+}
+
+
+@lru_cache
+def get_engine(name: str = None) -> ParserEngine:
+    """
+    Get the parser engine by name, defaulting to settings.parser_engine.
+    """
+    name = name or settings.parser_engine
+    try:
+        return ENGINES[name]()
+    except KeyError:
+        raise ValueError(f"Parser engine '{name}' is not recognized.")
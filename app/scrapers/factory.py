@@ -1,4 +1,10 @@
-from app.scrapers.zoom_scraper import ProductDetailsScraper, ProductOffersScraper, SearchProductScraper
+from app.scrapers.zoom_scraper import (
+    ProductBatchScraper,
+    ProductDetailsScraper,
+    ProductFullScraper,
+    ProductOffersScraper,
+    SearchProductScraper,
+)
 
 
 class ScraperFactory:
@@ -6,6 +12,8 @@ class ScraperFactory:
         "search": SearchProductScraper,
         "details": ProductDetailsScraper,
         "offers": ProductOffersScraper,
+        "full": ProductFullScraper,
+        "batch": ProductBatchScraper,
     }
 
     @staticmethod
@@ -0,0 +1,169 @@
+import operator
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from app.scrapers.engines import ParserEngine
+
+SIMPLE_SELECTOR_PATTERN = re.compile(
+    r"(?P<tag>[a-zA-Z][\w-]*)?"
+    r"(?P<classes>(?:\.[\w-]+)*)"
+    r"(?P<attrs>(?:\[[\w-]+(?:[*^$]?=(?:'[^']*'|\"[^\"]*\"|[\w-]+))?\])*)"
+)
+ATTRIBUTE_PATTERN = re.compile(r"\[([\w-]+)(?:([*^$]?=)('[^']*'|\"[^\"]*\"|[\w-]+))?\]")
+
+ATTRIBUTE_OPERATORS = {
+    None: lambda actual, expected: True,
+    "=": operator.eq,
+    "*=": operator.contains,
+    "^=": lambda actual, expected: actual.startswith(expected),
+    "$=": lambda actual, expected: actual.endswith(expected),
+}
+
+
+@dataclass(frozen=True)
+class SimpleSelector:
+    """One compound selector: tag, classes and attribute conditions, all on the same element."""
+
+    tag: Optional[str]
+    classes: tuple
+    attrs: tuple
+
+    def matches(self, engine: ParserEngine, node) -> bool:
+        if self.tag is not None and engine.tag(node) != self.tag:
+            return False
+        if self.classes:
+            node_classes = engine.classes(node)
+            if not all(name in node_classes for name in self.classes):
+                return False
+        for name, condition, expected in self.attrs:
+            actual = engine.attr(node, name)
+            if actual is None or not condition(actual, expected):
+                return False
+        return True
+
+
+class Selector:
+    """
+    CSS selector compiled once, at import time, into compound selectors matched directly against the tree.
+
+    Supports the subset used by the parsers: tag names, classes, attribute conditions ([a], [a=v], [a*=v],
+    [a^=v], [a$=v]) and the descendant combinator. The native form for each engine is compiled on first use.
+    """
+
+    def __init__(self, css: str):
+        self.css = css
+        self.parts = [self._parse_compound(part) for part in css.split()]
+        self._compiled: dict[str, Any] = {}
+
+    @staticmethod
+    def _parse_compound(part: str) -> SimpleSelector:
+        match = SIMPLE_SELECTOR_PATTERN.fullmatch(part)
+        if not match or not part:
+            raise ValueError(f"Unsupported CSS selector: '{part}'")
+        attrs = tuple(
+            (name, ATTRIBUTE_OPERATORS[op or None], value.strip("'\"") if value else None)
+            for name, op, value in ATTRIBUTE_PATTERN.findall(match.group("attrs"))
+        )
+        return SimpleSelector(match.group("tag"), tuple(filter(None, match.group("classes").split("."))), attrs)
+
+    def matches(self, engine: ParserEngine, node) -> bool:
+        """Whether node matches the selector, checking the ancestors for the descendant combinators."""
+        if not self.parts[-1].matches(engine, node):
+            return False
+        ancestor = node
+        for part in reversed(self.parts[:-1]):
+            ancestor = engine.parent(ancestor)
+            while ancestor is not None and not part.matches(engine, ancestor):
+                ancestor = engine.parent(ancestor)
+            if ancestor is None:
+                return False
+        return True
+
+    def native(self, engine: ParserEngine):
+        name = type(engine).__name__
+        if name not in self._compiled:
+            self._compiled[name] = engine.compile(self.css)
+        return self._compiled[name]
+
+    def select(self, engine: ParserEngine, node) -> list:
+        return engine.select(node, self.native(engine))
+
+    def select_one(self, engine: ParserEngine, node):
+        return engine.select_one(node, self.native(engine))
+
+
+@dataclass(frozen=True)
+class Field:
+    """
+    A value extracted from the first element matching `selector` (every matching element with `many=True`).
+
+    The value is the element's text (`joined=True` joins its stripped text pieces), the `attribute` value, or the
+    element itself with `node=True`. `normalize` is applied to values that were found; missing ones get `default`.
+    """
+
+    name: str
+    selector: str
+    attribute: Optional[str] = None
+    joined: bool = False
+    node: bool = False
+    many: bool = False
+    normalize: Optional[Callable] = None
+    default: Any = None
+    compiled: Selector = field(init=False, compare=False, repr=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "compiled", Selector(self.selector))
+
+    def value(self, engine: ParserEngine, node):
+        if self.node:
+            return node
+        if self.attribute is not None:
+            value = engine.attr(node, self.attribute)
+        elif self.joined:
+            value = engine.joined_text(node)
+        else:
+            value = engine.text(node)
+        if value is None:
+            return self.default
+        return self.normalize(value) if self.normalize else value
+
+
+class FieldSpec:
+    """
+    Declarative extraction of several fields under a scope element (a product card, an offer, a block...).
+
+    On engines whose trees are Python objects the fields are all resolved in a single walk over the scope's
+    elements; otherwise each field is one native query with its precompiled selector.
+    """
+
+    def __init__(self, *fields: Field):
+        self.fields = fields
+
+    def extract(self, engine: ParserEngine, scope) -> dict:
+        if engine.walk_fields:
+            return self._extract_walk(engine, scope)
+
+        record = {}
+        for spec in self.fields:
+            if spec.many:
+                record[spec.name] = [spec.value(engine, node) for node in spec.compiled.select(engine, scope)]
+            else:
+                node = spec.compiled.select_one(engine, scope)
+                record[spec.name] = spec.value(engine, node) if node is not None else spec.default
+        return record
+
+    def _extract_walk(self, engine: ParserEngine, scope) -> dict:
+        record = {spec.name: [] if spec.many else spec.default for spec in self.fields}
+        pending = list(self.fields)
+        for node in engine.elements(scope):
+            for spec in pending:
+                if spec.compiled.matches(engine, node):
+                    if spec.many:
+                        record[spec.name].append(spec.value(engine, node))
+                    else:
+                        record[spec.name] = spec.value(engine, node)
+                        pending = [other for other in pending if other is not spec]
+            if not pending:
+                break
+        return record
@@ -0,0 +1,206 @@
+"""
+Fast path over the page state that Next.js embeds in `<script id="__NEXT_DATA__">`.
+
+The blob is located with a substring scan and decoded with orjson, without building an HTML tree, then mapped to
+the same dicts the DOM parsers return. The containers are found by shape (e.g. a dict with a "hits" list) and the
+fields through key aliases, so the mapping survives the state being moved around.
+
+The key schema is inferred, not documented by Zoom, so the mapping is only trusted when complete: each function
+returns None when the expected data is not in the blob or any mapped record lacks one of its required fields, and the
+caller falls back to the DOM parsers.
+"""
+import re
+from collections import deque
+from typing import Any, Callable, Optional
+
+import orjson
+
+NEXT_DATA_MARKER = 'id="__NEXT_DATA__"'
+
+SEARCH_HIT_KEYS = {
+    "id": ("id", "productId"),
+    "name": ("name", "title"),
+    "merchant": ("bestMerchant", "merchant", "merchantName"),
+    "price": ("price", "bestPrice", "minPrice"),
+    "installments": ("installment", "installments", "priceInstallment"),
+    "rating": ("rating", "ratings"),
+    "image_url": ("image", "imageUrl", "thumbnail"),
+    "detail_url": ("url", "detailUrl", "link"),
+}
+SEARCH_HIT_REQUIRED = ("id", "name", "price", "image_url", "detail_url")
+SEARCH_PAGES_KEYS = ("nbPages", "totalPages", "pages")
+OFFER_KEYS = {
+    "price": ("price", "bestPrice", "priceInCash"),
+    "store_name": ("merchant", "store", "seller", "merchantName", "storeName"),
+    "purchase_link": ("url", "link", "offerUrl"),
+}
+OFFER_REQUIRED = ("price", "purchase_link")
+DETAILS_GROUPS_KEYS = ("attributeGroups", "specifications", "technicalSpecifications")
+DETAILS_GROUP_KEYS = {
+    "name": ("name", "title", "group"),
+    "attributes": ("attributes", "items", "specs"),
+}
+DETAILS_ATTRIBUTE_KEYS = {
+    "name": ("name", "key", "label"),
+    "value": ("value", "values"),
+}
+
+
+def find_next_data(html: str) -> Optional[dict]:
+    """Return the decoded __NEXT_DATA__ blob, or None when the page has none."""
+    marker = html.find(NEXT_DATA_MARKER)
+    if marker < 0:
+        return None
+    start = html.find(">", marker) + 1
+    end = html.find("</script>", start)
+    if not start or end < 0:
+        return None
+    try:
+        data = orjson.loads(html[start:end])
+    except orjson.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def find_container(data, predicate: Callable[[dict], bool]) -> Optional[dict]:
+    """Breadth-first search for the first dict in data matching predicate."""
+    queue = deque([data])
+    while queue:
+        node = queue.popleft()
+        if isinstance(node, dict):
+            if predicate(node):
+                return node
+            queue.extend(value for value in node.values() if isinstance(value, (dict, list)))
+        elif isinstance(node, list):
+            queue.extend(value for value in node if isinstance(value, (dict, list)))
+    return None
+
+
+def pick(item: dict, keys: tuple) -> Any:
+    for key in keys:
+        value = item.get(key)
+        if value is not None:
+            return value
+    return None
+
+
+def as_text(value) -> Optional[str]:
+    """Text of a value that may come as a string, a number or a dict with a label."""
+    if isinstance(value, dict):
+        value = pick(value, ("text", "label", "name", "value"))
+    if isinstance(value, list):
+        value = ", ".join(filter(None, map(as_text, value)))
+    if value is None or isinstance(value, str):
+        return value.strip() if value else value
+    return str(value)
+
+
+def as_price(value) -> Optional[float]:
+    """Price from a number, a dict with a value or a text like "R$ 1.299,90"."""
+    if isinstance(value, dict):
+        value = pick(value, ("value", "amount", "price"))
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        match = re.search(r"[\d.,]+", value)
+        return float(match.group(0).replace(".", "").replace(",", ".")) if match else None
+    return None
+
+
+def as_rating(value) -> Optional[str]:
+    """Rating in the card's "4.7 (99)" form from a dict with the score and the number of reviews."""
+    if isinstance(value, dict):
+        score = pick(value, ("value", "score", "average"))
+        count = pick(value, ("count", "total", "reviews"))
+        if score is None:
+            return None
+        return f"{score} ({count})" if count is not None else str(score)
+    return as_text(value)
+
+
+def is_complete(record: dict, required: tuple) -> bool:
+    return all(record[name] not in (None, "") for name in required)
+
+
+def search_page(data: dict) -> Optional[tuple[list, Optional[int]]]:
+    """
+    Products and last page of a search page, as returned by parse_search_page.
+    Returns None when the blob has no products or any of them lacks a required field.
+    """
+    container = find_container(data, lambda node: isinstance(node.get("hits"), list))
+    if container is None:
+        return None
+
+    products = []
+    for hit in container["hits"]:
+        if not isinstance(hit, dict) or pick(hit, SEARCH_HIT_KEYS["name"]) is None:
+            continue
+        merchant = as_text(pick(hit, SEARCH_HIT_KEYS["merchant"]))
+        products.append({
+            "id": str(pick(hit, SEARCH_HIT_KEYS["id"]) or ""),
+            "name": as_text(pick(hit, SEARCH_HIT_KEYS["name"])),
+            "description": f"Menor preço via {merchant}" if merchant else None,
+            "price": as_price(pick(hit, SEARCH_HIT_KEYS["price"])),
+            "installments": as_text(pick(hit, SEARCH_HIT_KEYS["installments"])),
+            "ratings": as_rating(pick(hit, SEARCH_HIT_KEYS["rating"])),
+            "image_url": as_text(pick(hit, SEARCH_HIT_KEYS["image_url"])),
+            "detail_url": as_text(pick(hit, SEARCH_HIT_KEYS["detail_url"])),
+        })
+    if not products or not all(
+            is_complete(product, SEARCH_HIT_REQUIRED) and product["id"].isdigit() for product in products
+    ):
+        return None
+
+    last_page = pick(container, SEARCH_PAGES_KEYS)
+    return products, int(last_page) if last_page else None
+
+
+def product_offers(data: dict) -> Optional[list]:
+    """Offers of a product page, or None when the blob has no offer list or an offer lacks a required field."""
+    container = find_container(
+        data, lambda node: isinstance(node.get("offers"), list)
+        and all(isinstance(offer, dict) and "price" in offer for offer in node["offers"])
+    )
+    if container is None:
+        return None
+    offers = [
+        {
+            "price": as_price(pick(offer, OFFER_KEYS["price"])),
+            "store_name": as_text(pick(offer, OFFER_KEYS["store_name"])),
+            "purchase_link": as_text(pick(offer, OFFER_KEYS["purchase_link"])),
+        }
+        for offer in container["offers"]
+    ]
+    return offers if all(is_complete(offer, OFFER_REQUIRED) for offer in offers) else None
+
+
+def product_details(data: dict) -> Optional[dict]:
+    """
+    Details of a product page in the DOM parser's layout: the description under "Descrição" and one dict of
+    attributes per group. Returns None when the blob has no attribute groups, they are empty, or any attribute lacks
+    its name or value, so that the DOM parser reads the page instead of dropping the attribute.
+    """
+    container = find_container(data, lambda node: isinstance(pick(node, DETAILS_GROUPS_KEYS), list))
+    if container is None:
+        return None
+
+    details = {}
+    description = as_text(container.get("description"))
+    if description:
+        details["Descrição"] = description
+    for group in pick(container, DETAILS_GROUPS_KEYS):
+        if not isinstance(group, dict):
+            return None
+        attributes = details.setdefault(as_text(pick(group, DETAILS_GROUP_KEYS["name"])) or "Outros", {})
+        if not isinstance(attributes, dict):
+            # Grupo com o mesmo nome da descrição: como no DOM, a descrição ocupa a chave.
+            continue
+        for attribute in pick(group, DETAILS_GROUP_KEYS["attributes"]) or []:
+            if not isinstance(attribute, dict):
+                return None
+            name = as_text(pick(attribute, DETAILS_ATTRIBUTE_KEYS["name"]))
+            value = as_text(pick(attribute, DETAILS_ATTRIBUTE_KEYS["value"]))
+            if name is None or value is None:
+                return None
+            attributes[name] = value
+    return details or None
@@ -1,27 +1,79 @@
 import re
 from abc import ABC, abstractmethod
 
-from bs4 import BeautifulSoup
+from app.core.config import settings
+from app.scrapers import next_data
+from app.scrapers.engines import ParserEngine, get_engine
+from app.scrapers.fields import Field, FieldSpec, Selector
+
+# Versão da saída dos parsers; aumente a cada mudança que altere o resultado, para invalidar os parses memorizados.
+PARSER_VERSION = 2
 
 
 class Parser(ABC):
-    def __init__(self, html: str):
-        self.soup = BeautifulSoup(html, "html.parser")
+    def __init__(self, html: str = None, tree=None, engine: ParserEngine = None):
+        self.engine = engine or get_engine()
+        self.tree = tree if tree is not None else self.engine.parse(html)
 
     @abstractmethod
     def parser(self):
         """Parse the HTML content and return the relevant data."""
         pass
 
-    def get_text(self, selector: str, scope=None):
-        """Get the text content of the first matching element."""
-        element = (scope or self.soup).select_one(selector)
-        return element.get_text(strip=True) if element else None
-
-    def get_attribute(self, selector: str, attribute: str, scope=None):
-        """Get the value of the specified attribute from the first matching element."""
-        element = (scope or self.soup).select_one(selector)
-        return element[attribute] if element and attribute in element.attrs else None
+    def text(self, element) -> str:
+        """Get the whole text content of an element, stripped."""
+        return self.engine.text(element)
+
+
+def card_id(value: str) -> str:
+    """Product id from the card title's element id, e.g. "product-card-123::name" -> "123"."""
+    return value.split("::")[0].replace("product-card-", "")
+
+
+def parse_price(text: str) -> float | None:
+    """Price from a text like "R$ 1.299,90"."""
+    return float(text.replace("R$", "").replace(".", "").replace(",", ".").strip()) if text else None
+
+
+def parse_offer_price(text: str) -> float | None:
+    """First number in a text like "R$1.299,90 à vista"."""
+    match = re.search(r"[\d.,]+", text)
+    return float(match.group(0).replace(".", "").replace(",", ".")) if match else None
+
+
+PRODUCT_CARD = Selector(".Hits_ProductCard__Bonl_")
+PRODUCT_CARD_FIELDS = FieldSpec(
+    Field("id", "h2.ProductCard_ProductCard_Name__U_mUQ", attribute="id", normalize=card_id, default=""),
+    Field("name", "h2.ProductCard_ProductCard_Name__U_mUQ", normalize=lambda name: name.replace("\\", "")),
+    Field("description", "h3.ProductCard_ProductCard_BestMerchant__JQo_V"),
+    Field("price", "p[data-testid='product-card::price']", normalize=parse_price),
+    Field("installments", "span.ProductCard_ProductCard_Installment__XZEnD"),
+    Field("ratings", "div[data-testid='product-card::rating']"),
+    Field("image_url", "img", attribute="src"),
+    Field("detail_url", "a", attribute="href"),
+)
+PAGE_LINK = Selector("a[href*='page=']")
+
+DETAILS_SECTION = Selector("div[data-testid='detailsSection-masonry']")
+ATTRIBUTE_BLOCK = Selector("div.DetailsContent_AttributeBlock__lGim_")
+ATTRIBUTE_BLOCK_FIELDS = FieldSpec(
+    Field("group_name", "h3.AttributeBlock_GroupTitle__XIqmq", default="Outros"),
+    Field("description", "div.AttributeBlock_GroupContent__rKxrs p"),
+    Field("rows", "tr.Row_Row__kKYw6", node=True, many=True),
+)
+ATTRIBUTE_ROW_FIELDS = FieldSpec(
+    Field("name", "th.AttributeName_Key__JJU2r span"),
+    Field("value", "td.AttributeValues_Value__iqjHN span"),
+)
+SIMPLIFIED_DETAILS_SECTION = Selector("section.DetailsSection_DetailsSection__4RLSH")
+SIMPLIFIED_DESCRIPTION = Selector("div.DetailsContentSimplified_ContentSimplified__2Rszi p")
+
+OFFER_CARD = Selector("div[data-testid='offer-card-wrapper']")
+OFFER_CARD_FIELDS = FieldSpec(
+    Field("price", "a[data-testid='offer-price'] .OfferPrice_InCash___m2LM", joined=True, normalize=parse_offer_price),
+    Field("store_name", "a[data-testid='offer-merchant'] h3", joined=True),
+    Field("purchase_link", "a[data-testid='offer-price']", attribute="href"),
+)
 
 
 class SearchParser(Parser):
@@ -32,45 +84,24 @@ class SearchParser(Parser):
 
     def parser(self):
         products = []
-
-        product_cards = self.soup.select(".Hits_ProductCard__Bonl_")
-        for item in product_cards:
-
-            name_element = item.select_one("h2.ProductCard_ProductCard_Name__U_mUQ")
-            if name_element:
-                id_product = name_element.get("id", "").split("::")[0].replace(
-                    "product-card-", "") if name_element else None
-                name_product = name_element.text.strip().replace("\\", "") if name_element else None
-
-                price_source = item.select_one("h3.ProductCard_ProductCard_BestMerchant__JQo_V")
-                price_source_text = price_source.text.strip() if price_source else None
-
-                price_element = item.select_one("p[data-testid='product-card::price']")
-                price_text = price_element.text.strip() if price_element else None
-                price_value = (
-                    float(price_text.replace("R$", "").replace(".", "").replace(",", ".").strip())
-                    if price_text else None
-                )
-
-                installment_element = item.select_one("span.ProductCard_ProductCard_Installment__XZEnD")
-                installment_text = installment_element.text.strip() if installment_element else None
-
-                ratings_element = item.select_one("div[data-testid='product-card::rating']")
-                ratings_text = ratings_element.text.strip() if ratings_element else None
-
-                products.append({
-                    "id": id_product,
-                    "name": name_product,
-                    "description": price_source_text,
-                    "price": price_value,
-                    "installments": installment_text,
-                    "ratings": ratings_text,
-                    "image_url": item.select_one("img")["src"] if item.select_one("img") else None,
-                    "detail_url": item.select_one("a")["href"] if item.select_one("a") else None
-                })
-
+        for card in PRODUCT_CARD.select(self.engine, self.tree):
+            product = PRODUCT_CARD_FIELDS.extract(self.engine, card)
+            if product["name"] is not None:
+                products.append(product)
         return products
 
+    def total_pages(self):
+        """
+        Return the last page number linked from the search paginator.
+        Retorna None quando a página não possui paginação (resultado em página única ou layout desconhecido).
+        """
+        pages = []
+        for link in PAGE_LINK.select(self.engine, self.tree):
+            match = re.search(r"[?&]page=(\d+)", self.engine.attr(link, "href") or "")
+            if match:
+                pages.append(int(match.group(1)))
+        return max(pages) if pages else None
+
 
 class ProductDetailsParser(Parser):
     """
@@ -84,38 +115,29 @@ class ProductDetailsParser(Parser):
     def parser(self):
         details = {}
 
-        content_section = self.soup.select_one("div[data-testid='detailsSection-masonry']")
-        if content_section:
-            attribute_blocks = content_section.select("div.DetailsContent_AttributeBlock__lGim_")
-            for block in attribute_blocks:
-                group_title = block.select_one("h3.AttributeBlock_GroupTitle__XIqmq")
-                group_name = group_title.text.strip() if group_title else "Outros"
+        content_section = DETAILS_SECTION.select_one(self.engine, self.tree)
+        if content_section is not None:
+            for block in ATTRIBUTE_BLOCK.select(self.engine, content_section):
+                group = ATTRIBUTE_BLOCK_FIELDS.extract(self.engine, block)
+                group_name = group["group_name"]
 
                 if group_name not in details:
                     details[group_name] = {}
 
-                if group_name == "Descrição":
-                    description_content = block.select_one("div.AttributeBlock_GroupContent__rKxrs p")
-                    if description_content:
-                        details[group_name] = description_content.text.strip()
+                if group_name == "Descrição" and group["description"] is not None:
+                    details[group_name] = group["description"]
 
-                rows = block.select("tr.Row_Row__kKYw6")
-                for row in rows:
-                    attribute_name = row.select_one("th.AttributeName_Key__JJU2r span")
-                    attribute_value = row.select_one("td.AttributeValues_Value__iqjHN span")
-
-                    if attribute_name and attribute_value:
-                        name = attribute_name.text.strip()
-                        value = attribute_value.text.strip()
-                        details[group_name][name] = value
+                for row in group["rows"]:
+                    attribute = ATTRIBUTE_ROW_FIELDS.extract(self.engine, row)
+                    if attribute["name"] is not None and attribute["value"] is not None:
+                        details[group_name][attribute["name"]] = attribute["value"]
 
         else:
-            description_section = self.soup.select_one("section.DetailsSection_DetailsSection__4RLSH")
-            if description_section:
-                description_element = description_section.select_one(
-                    "div.DetailsContentSimplified_ContentSimplified__2Rszi p")
-                if description_element:
-                    details["Descrição"] = description_element.text.strip()
+            description_section = SIMPLIFIED_DETAILS_SECTION.select_one(self.engine, self.tree)
+            if description_section is not None:
+                description_element = SIMPLIFIED_DESCRIPTION.select_one(self.engine, description_section)
+                if description_element is not None:
+                    details["Descrição"] = self.text(description_element)
 
         return details if details else None
 
@@ -131,18 +153,64 @@ class ProductOffersParser(Parser):
     """
 
     def parser(self):
-        offers = []
-        offer_cards = self.soup.select("div[data-testid='offer-card-wrapper']")
-        for card in offer_cards:
-            price_text = self.get_text("a[data-testid='offer-price'] .OfferPrice_InCash___m2LM", card)
-            if price_text:
-                match = re.search(r"[\d.,]+", price_text)
-                cleaned_price = match.group(0).replace(".", "").replace(",", ".") if match else None
-                price_value = float(cleaned_price) if cleaned_price else None
-
-            offers.append({
-                "price": price_value,
-                "store_name": self.get_text("a[data-testid='offer-merchant'] h3", card),
-                "purchase_link": self.get_attribute("a[data-testid='offer-price']", "href", card)
-            })
+        offers = [OFFER_CARD_FIELDS.extract(self.engine, card) for card in OFFER_CARD.select(self.engine, self.tree)]
         return offers if offers else None
+
+
+def embedded_data(html: str) -> dict | None:
+    """The page state embedded by Next.js, when enabled by settings.parser_embedded_json and present."""
+    return next_data.find_next_data(html) if settings.parser_embedded_json else None
+
+
+def parse_product_page(html: str, fields: tuple = ("details", "offers")) -> dict:
+    """
+    Read the requested fields from the embedded page state; the ones it lacks come from a single parse tree of
+    the page, shared by their DOM parsers.
+    """
+    data = embedded_data(html)
+    page = {}
+    if data is not None:
+        if "details" in fields:
+            page["details"] = next_data.product_details(data)
+        if "offers" in fields:
+            page["offers"] = next_data.product_offers(data)
+
+    missing = [name for name in fields if page.get(name) is None]
+    if missing:
+        engine = get_engine()
+        tree = engine.parse(html)
+        if "details" in missing:
+            page["details"] = ProductDetailsParser(tree=tree, engine=engine).parser()
+        if "offers" in missing:
+            page["offers"] = ProductOffersParser(tree=tree, engine=engine).parser()
+    if "offers" in fields:
+        page["offers"] = page["offers"] or []
+    return page
+
+
+def parse_search_page(html: str) -> tuple[list, int | None]:
+    """
+    Parse a search results page into its product dicts and the last page number from the paginator.
+    """
+    data = embedded_data(html)
+    if data is not None:
+        result = next_data.search_page(data)
+        if result is not None:
+            return result
+
+    search_parser = SearchParser(html)
+    return search_parser.parser(), search_parser.total_pages()
+
+
+def parse_product_details(html: str):
+    data = embedded_data(html)
+    details = next_data.product_details(data) if data is not None else None
+    return details if details is not None else ProductDetailsParser(html).parser()
+
+
+def parse_product_offers(html: str):
+    data = embedded_data(html)
+    offers = next_data.product_offers(data) if data is not None else None
+    if offers is not None:
+        return offers or None
+    return ProductOffersParser(html).parser()
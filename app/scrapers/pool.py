@@ -0,0 +1,97 @@
+import asyncio
+import hashlib
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+
+from app.core.cache import cache_manager
+from app.core.config import settings
+from app.core.metrics import CACHE_LOOKUPS, PARSE_SECONDS
+from app.core.tracing import span
+from app.scrapers.engines import get_engine
+from app.scrapers.parser import PARSER_VERSION
+
+
+def warm_up_worker():
+    """Import the parsers and build the configured engine once in the worker."""
+    get_engine().parse("<html></html>")
+
+
+class ParserPool:
+    """
+    Executa o parsing de HTML fora do event loop.
+
+    Com kind="process" o parsing roda em um ProcessPoolExecutor; com "thread" em um ThreadPoolExecutor (útil quando
+    o engine libera o GIL); com "inline" roda direto no event loop. Apenas o HTML e os dicts já parseados cruzam a
+    fronteira do pool, nunca a árvore do documento.
+
+    Os resultados de `parse` são memorizados no cache pelo hash do HTML, então uma página idêntica (por exemplo,
+    devolvida por um 304 do upstream) nunca é parseada duas vezes. A chave inclui PARSER_VERSION e a configuração
+    dos parsers, para que uma correção ou troca de engine não continue servindo resultados antigos.
+    """
+
+    def __init__(self, kind: str, workers: int, memo_ttl: int):
+        self.kind = kind
+        self.workers = workers
+        self.memo_ttl = memo_ttl
+        self.executor: Executor | None = None
+
+    async def start(self):
+        """
+        Create the pool and warm up every worker so the first requests do not pay for process start-up.
+        """
+        if self.kind == "process":
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        elif self.kind == "thread":
+            self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="parser")
+        elif self.kind == "inline":
+            return
+        else:
+            raise ValueError(f"Parser pool kind '{self.kind}' is not recognized.")
+
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.executor, warm_up_worker) for _ in range(self.workers)))
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+    async def run(self, func: Callable[..., Any], *args):
+        """
+        Run a module-level parse function in the pool; runs inline when the pool was not started.
+        """
+        with PARSE_SECONDS.labels(func.__name__).time(), span("parse", parser=func.__name__):
+            if self.executor is None:
+                return func(*args)
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def parse(self, func: Callable[..., Any], html: str, *args):
+        """
+        Run func(html, *args) in the pool, reusing the result already computed for the same HTML content.
+        """
+        if cache_manager.redis_client is None:
+            return await self.run(func, html, *args)
+
+        digest = hashlib.sha1(html.encode("utf-8")).hexdigest()
+        key = ":".join([
+            f"{settings.redis_prefix}:parsed:v{PARSER_VERSION}:{settings.parser_engine}",
+            f"json={int(settings.parser_embedded_json)}:{func.__name__}", *map(str, args), digest,
+        ])
+        result = await cache_manager.get_object_value(key)
+        if result is not None:
+            CACHE_LOOKUPS.labels("parse_memo", "hit").inc()
+            return result
+
+        CACHE_LOOKUPS.labels("parse_memo", "miss").inc()
+        result = await self.run(func, html, *args)
+        await cache_manager.set_object_value(key, result, expire=self.memo_ttl)
+        return result
+
+
+parser_pool = ParserPool(
+    kind=settings.parser_pool_kind,
+    # By default the CPUs are split between the API workers, each one with its own pool.
+    workers=settings.parser_pool_workers or max((os.cpu_count() or 1) // settings.server_worker_count, 1),
+    memo_ttl=settings.parse_memo_ttl,
+)
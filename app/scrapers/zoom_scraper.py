@@ -1,6 +1,21 @@
+import asyncio
+import math
+import zlib
 from abc import ABC, abstractmethod
+from urllib.parse import quote_plus
 
-from app.scrapers.parser import SearchParser, ProductOffersParser, ProductDetailsParser
+import httpx
+
+from app.core.config import settings
+from app.core.metrics import CACHE_LOOKUPS, SEARCH_PAGES
+from app.core.product_index import product_index
+from app.scrapers.parser import (
+    parse_product_details,
+    parse_product_offers,
+    parse_product_page,
+    parse_search_page,
+)
+from app.scrapers.pool import parser_pool
 
 
 class Scraper(ABC):
@@ -11,55 +26,245 @@ class Scraper(ABC):
 
 
 class SearchProductScraper(Scraper):
-    async def execute(self, base_url: str, query: str, cache_manager, fetch_url):
+    SEARCH_PATH = "/search?q={query}&hitsPerPage={hits_per_page}&page={page}&sortBy={sort_by}&isDealsPage=false&enableRefinementsSuggestions=true"
+
+    async def execute(self, base_url: str, query: str, cache_manager, fetch_url, page: int = None,
+                      limit: int = None, sort_by: str = "default", hits_per_page: int = 48, refresh: bool = False):
         products = []
-        page = 1
         total_pages = 0
 
-        while True:
-            url = f"{base_url}/search?q={query}&hitsPerPage=48&page={page}&sortBy=default&isDealsPage=false&enableRefinementsSuggestions=true"
-            response_text = await fetch_url(url)
-            search_parser = SearchParser(response_text)
-            page_products = search_parser.parser()
-
-            if not page_products:
-                break
-
-            for product in page_products:
-                cached_url = await cache_manager.get_cache_value(product["id"])
-                if not cached_url:
-                    await cache_manager.set_cache_value(product["id"], product["detail_url"], expire=900)
-
+        async for page_products in self.iter_pages(
+                base_url, query, cache_manager, fetch_url,
+                page=page, limit=limit, sort_by=sort_by, hits_per_page=hits_per_page, refresh=refresh,
+        ):
             products.extend(page_products)
-            page += 1
             total_pages += 1
 
         return {"products": products, "total_pages": total_pages, "total_products": len(products)}
 
+    async def iter_pages(self, base_url: str, query: str, cache_manager, fetch_url, page: int = None,
+                         limit: int = None, sort_by: str = "default", hits_per_page: int = 48,
+                         refresh: bool = False):
+        pages = 0
+        try:
+            async for page_products in self._iter_pages(
+                    base_url, query, cache_manager, fetch_url,
+                    page=page, limit=limit, sort_by=sort_by, hits_per_page=hits_per_page, refresh=refresh,
+            ):
+                pages += 1
+                yield page_products
+        finally:
+            SEARCH_PAGES.observe(pages)
+
+    async def _iter_pages(self, base_url: str, query: str, cache_manager, fetch_url, page: int = None,
+                          limit: int = None, sort_by: str = "default", hits_per_page: int = 48,
+                          refresh: bool = False):
+        """
+        Busca a primeira página para descobrir o total de páginas e então busca as demais concorrentemente,
+        limitadas por `settings.search_max_concurrency`.
+        Gera os produtos de cada página, na ordem das páginas, assim que a página é parseada.
+
+        Com `page`, busca apenas aquela página. Com `limit`, busca só as páginas necessárias para completar
+        `limit` produtos. Cada página fica em cache individualmente, então paginações posteriores a reaproveitam;
+        com `refresh` (usado pelo aquecimento do cache) as páginas em cache são ignoradas e baixadas de novo.
+        """
+        semaphore = asyncio.Semaphore(settings.search_max_concurrency)
+        remaining = limit
+
+        def fetch(page_number: int):
+            return self._fetch_page(
+                base_url, query, page_number, sort_by, hits_per_page, cache_manager, fetch_url, semaphore, refresh
+            )
+
+        first_page = page or 1
+        page_products, last_page = await fetch(first_page)
+        if not page_products:
+            return
+        if remaining is not None:
+            page_products = page_products[:remaining]
+            remaining -= len(page_products)
+        await self._index_products(page_products, cache_manager)
+        yield page_products
+
+        if page is not None:
+            return
+
+        max_page = math.ceil(limit / hits_per_page) if limit else None
+        next_page = 2
+        # Sem paginador, sonda uma janela de páginas por vez. Depois da última página do paginador, sonda só a
+        # seguinte; a janela só é aberta se ela tiver produtos (paginador truncado).
+        probe_size = 1 if last_page else settings.search_max_concurrency
+        while max_page is None or next_page <= max_page:
+            if last_page and last_page >= next_page:
+                end_page = last_page
+            else:
+                end_page = next_page + probe_size - 1
+                probe_size = settings.search_max_concurrency
+            if max_page is not None:
+                end_page = min(end_page, max_page)
+
+            tasks = [asyncio.create_task(fetch(page_number)) for page_number in range(next_page, end_page + 1)]
+            try:
+                for task in tasks:
+                    page_products, _ = await task
+                    if not page_products:
+                        return
+                    if remaining is not None:
+                        page_products = page_products[:remaining]
+                        remaining -= len(page_products)
+                    await self._index_products(page_products, cache_manager)
+                    yield page_products
+                    if remaining == 0:
+                        return
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+            next_page = end_page + 1
+
+    @staticmethod
+    async def _index_products(page_products: list, cache_manager):
+        await product_index.upsert({product["id"]: product["detail_url"] for product in page_products})
+
+    async def _fetch_page(self, base_url: str, query: str, page: int, sort_by: str, hits_per_page: int,
+                          cache_manager, fetch_url, semaphore: asyncio.Semaphore, refresh: bool = False):
+        page_key = f"{settings.redis_prefix}:search_page:{query}:{sort_by}:{hits_per_page}:{page}"
+        cached_page = None if refresh else await cache_manager.get_object_value(page_key)
+        if cached_page:
+            CACHE_LOOKUPS.labels("search_page", "hit").inc()
+            page_products, last_page = cached_page
+            return page_products, last_page
+        CACHE_LOOKUPS.labels("search_page", "miss").inc()
+
+        search_path = self.SEARCH_PATH.format(
+            query=quote_plus(query), page=page, sort_by=quote_plus(sort_by), hits_per_page=hits_per_page
+        )
+        url = f"{base_url}{search_path}"
+        async with semaphore:
+            response_text = await fetch_url(url)
+        page_products, last_page = await parser_pool.parse(parse_search_page, response_text)
+
+        if page_products:
+            await cache_manager.set_object_value(
+                page_key, [page_products, last_page], expire=settings.search_cache_ttl
+            )
+        return page_products, last_page
+
 
-class ProductDetailsScraper(Scraper):
-    async def execute(self, base_url: str, product_id: int, cache_manager, fetch_url):
-        detail_url_bytes = await cache_manager.get_cache_value(product_id)
-        if not detail_url_bytes:
+class ProductPageScraper(Scraper, ABC):
+    """
+    Base dos scrapers da página de produto.
+    A página é baixada uma única vez e mantida no cache (comprimida) por um TTL curto, para que detalhes e ofertas
+    do mesmo produto não a busquem novamente. Com `refresh` a cópia em cache é ignorada.
+    """
+
+    async def fetch_product_page(self, base_url: str, product_id: int, cache_manager, fetch_url,
+                                 refresh: bool = False):
+        cached_page = None if refresh else await cache_manager.get_cache_value(self.page_key(product_id))
+        if cached_page:
+            CACHE_LOOKUPS.labels("product_page", "hit").inc()
+            return zlib.decompress(cached_page).decode("utf-8")
+        CACHE_LOOKUPS.labels("product_page", "miss").inc()
+
+        detail_url = await product_index.get(product_id) or self.fallback_url(product_id)
+        if not detail_url:
             return None
 
-        detail_url = detail_url_bytes.decode("utf-8")
+        try:
+            return await self.download_product_page(base_url, product_id, detail_url, cache_manager, fetch_url)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return None
+            raise
+
+    async def download_product_page(self, base_url: str, product_id: int, detail_url: str, cache_manager, fetch_url):
         full_url = f"{base_url}{detail_url}"
         response_text = await fetch_url(full_url)
 
-        details_parser = ProductDetailsParser(response_text)
-        return details_parser.parser()
+        await cache_manager.set_cache_value(
+            self.page_key(product_id), zlib.compress(response_text.encode("utf-8")),
+            expire=settings.product_page_cache_ttl,
+        )
+        return response_text
+
+    @staticmethod
+    def page_key(product_id: int) -> str:
+        return f"{settings.redis_prefix}:page:{product_id}"
+
+    @staticmethod
+    def fallback_url(product_id: int) -> str | None:
+        """
+        URL usada quando o produto não está no índice (nunca apareceu em uma busca), a partir de
+        `settings.product_url_fallback`. Sem o template configurado, o produto é tratado como não encontrado.
+        """
+        if not settings.product_url_fallback:
+            return None
+        return settings.product_url_fallback.format(product_id=product_id)
+
+
+class ProductDetailsScraper(ProductPageScraper):
+    async def execute(self, base_url: str, product_id: int, cache_manager, fetch_url, refresh: bool = False):
+        response_text = await self.fetch_product_page(base_url, product_id, cache_manager, fetch_url, refresh)
+        if not response_text:
+            return None
+
+        return await parser_pool.parse(parse_product_details, response_text)
 
 
-class ProductOffersScraper(Scraper):
-    async def execute(self, base_url: str, product_id: int, cache_manager, fetch_url):
-        detail_url_bytes = await cache_manager.get_cache_value(product_id)
-        if not detail_url_bytes:
+class ProductOffersScraper(ProductPageScraper):
+    async def execute(self, base_url: str, product_id: int, cache_manager, fetch_url, refresh: bool = False):
+        response_text = await self.fetch_product_page(base_url, product_id, cache_manager, fetch_url, refresh)
+        if not response_text:
             return []
 
-        detail_url = detail_url_bytes.decode("utf-8")
-        full_url = f"{base_url}{detail_url}"
-        response_text = await fetch_url(full_url)
+        return await parser_pool.parse(parse_product_offers, response_text)
+
+
+class ProductFullScraper(ProductPageScraper):
+    async def execute(self, base_url: str, product_id: int, cache_manager, fetch_url, refresh: bool = False):
+        response_text = await self.fetch_product_page(base_url, product_id, cache_manager, fetch_url, refresh)
+        if not response_text:
+            return None
+
+        return await parser_pool.parse(parse_product_page, response_text)
+
+
+class ProductBatchScraper(ProductPageScraper):
+    async def execute(self, base_url: str, product_ids: list[int], cache_manager, fetch_url,
+                      fields: tuple = ("details", "offers")):
+        """
+        Busca detalhes e/ou ofertas de vários produtos de uma vez.
+        As páginas em cache (MGET) e as URLs de detalhe (HMGET no índice) são resolvidas em paralelo; as páginas
+        restantes são baixadas concorrentemente (limitadas por `settings.batch_max_concurrency`) e parseadas em
+        paralelo no pool.
+        Retorna um resultado por ID, com `error` quando o produto não pôde ser obtido.
+        """
+        cached_pages, detail_urls = await asyncio.gather(
+            cache_manager.get_cache_values([self.page_key(product_id) for product_id in product_ids]),
+            product_index.get_many(product_ids),
+        )
+        semaphore = asyncio.Semaphore(settings.batch_max_concurrency)
+
+        async def fetch_one(product_id: int, cached_page: bytes | None, detail_url: str | None):
+            detail_url = detail_url or self.fallback_url(product_id)
+            try:
+                if cached_page:
+                    response_text = zlib.decompress(cached_page).decode("utf-8")
+                elif detail_url:
+                    async with semaphore:
+                        response_text = await self.download_product_page(
+                            base_url, product_id, detail_url, cache_manager, fetch_url
+                        )
+                else:
+                    return {"id": product_id, "error": "Produto não encontrado"}
+
+                page = await parser_pool.parse(parse_product_page, response_text, tuple(fields))
+                return {"id": product_id, **page}
+            except Exception as e:
+                return {"id": product_id, "error": str(e)}
 
-        offers_parser = ProductOffersParser(response_text)
-        return offers_parser.parser()
+        return await asyncio.gather(*(
+            fetch_one(product_id, cached_page, detail_url)
+            for product_id, cached_page, detail_url in zip(product_ids, cached_pages, detail_urls)
+        ))
@@ -0,0 +1,43 @@
+import os
+import tempfile
+
+import uvicorn
+
+from app.core.config import settings
+from app.core.database import init_db
+from app.core.logs import logger
+
+
+def main():
+    """
+    Production entry point: python -m app.server
+
+    Runs settings.server_worker_count uvicorn worker processes on uvloop and httptools. Each worker opens its own
+    Redis, HTTP and parser pools in the lifespan; on shutdown, requests and in-flight scrapes get
+    settings.server_graceful_timeout seconds to finish.
+    """
+    workers = settings.server_worker_count
+    logger.info("Starting %s worker(s) on %s:%s", workers, settings.server_host, settings.server_port)
+    # Creates the tables before forking, so the workers' lifespans find them ready instead of racing on them.
+    init_db()
+    if workers > 1 and "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        # Lets /metrics aggregate every worker; set before the workers import prometheus_client.
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="zoom-metrics-")
+
+    uvicorn.run(
+        "app.main:app",
+        host=settings.server_host,
+        port=settings.server_port,
+        workers=workers,
+        backlog=settings.server_backlog,
+        loop="uvloop",
+        http="httptools",
+        timeout_graceful_shutdown=settings.server_graceful_timeout,
+        # Keeps uvicorn from installing its own handlers: its error and access logs propagate to the root logger set
+        # up by init_logs, so they go through the queue with the configured format and the request's correlation ID.
+        log_config=None,
+    )
+
+
+if __name__ == "__main__":
+    main()
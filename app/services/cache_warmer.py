@@ -0,0 +1,232 @@
+import asyncio
+from collections import Counter
+
+import orjson
+
+from app.core.cache import cache_manager
+from app.core.config import settings
+from app.core.logs import logger
+from app.core.response_cache import (
+    ResponseCache,
+    full_response_cache,
+    product_response_cache,
+    search_cache_key,
+    search_response_cache,
+    stores_response_cache,
+)
+from app.scrapers.pool import parser_pool
+from app.services.product_service import ProductSearchService
+from app.services.search_service import SearchService
+from app.utils.http_client import http_client
+
+
+class CacheWarmer:
+    """
+    Mantém aquecido o cache das buscas e produtos mais consultados.
+
+    Com `mode="lifespan"` o aquecimento roda nos workers da API; com `mode="worker"` os workers só registram as
+    consultas e o aquecimento roda em um processo separado (`python -m app.services.cache_warmer`).
+
+    Cada worker conta localmente as consultas e, a cada ciclo, soma as contagens em sorted sets do Redis.
+    O worker que obtém o lock do ciclo refaz o scraping dos `top_terms` termos e `top_products` produtos mais
+    frequentes cujas entradas vão expirar em até `lead` segundos, respeitando um orçamento de requisições ao Zoom.
+    Os refreshes ignoram as páginas guardadas pelos scrapers, para que o dado seja de fato buscado de novo.
+    As frequências decaem pela metade a cada ciclo, para acompanhar o que está em alta.
+
+    Os acertos e falhas dos caches de resposta de cada worker também são somados no Redis, para que o relatório do
+    ciclo cubra todos os workers mesmo quando o aquecimento roda em outro processo.
+    """
+
+    PRODUCT_CACHES: dict[str, ResponseCache] = {
+        "product": product_response_cache,
+        "stores": stores_response_cache,
+        "full": full_response_cache,
+    }
+    RESPONSE_CACHES: dict[str, ResponseCache] = {"search": search_response_cache, **PRODUCT_CACHES}
+
+    def __init__(self, mode: str, interval: int, top_terms: int, top_products: int, request_budget: int, lead: int):
+        self.mode = mode
+        self.interval = interval
+        self.top_terms = top_terms
+        self.top_products = top_products
+        self.request_budget = request_budget
+        self.lead = lead
+        self.terms_key = f"{settings.redis_prefix}:warmer:terms"
+        self.products_key = f"{settings.redis_prefix}:warmer:products"
+        self.lock_key = f"{settings.redis_prefix}:warmer:lock"
+        self.served_key = f"{settings.redis_prefix}:warmer:served"
+        self._counts: Counter = Counter()
+        self._served_reported: Counter = Counter()
+        self._task = None
+
+    def record_search(self, term: str, options: dict):
+        if self.mode != "off":
+            self._counts[(self.terms_key, orjson.dumps({"term": term, "options": options}))] += 1
+
+    def record_product(self, kind: str, product_id: int):
+        if self.mode != "off":
+            self._counts[(self.products_key, orjson.dumps({"kind": kind, "id": product_id}))] += 1
+
+    def start(self):
+        """
+        Start the background loop in the API worker.
+        In "worker" mode the API only flushes its query counts; a separate process does the warming.
+        """
+        if self.mode == "off":
+            return
+        self._task = asyncio.create_task(self.run(warm=self.mode == "lifespan"))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def run(self, warm: bool = True):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush_counts()
+                if warm and await cache_manager.redis_client.set(self.lock_key, 1, nx=True, ex=self.interval):
+                    await self.warm()
+            except Exception as e:
+                logger.error("Cache warmer cycle failed: %s", e)
+
+    async def flush_counts(self):
+        """
+        Add the locally counted queries to the shared sorted sets, and the response cache hits and misses since the
+        last flush to the shared counters, in one pipelined round trip.
+        """
+        counts, self._counts = self._counts, Counter()
+        served = self._served_since_flush()
+        if not counts and not served:
+            return
+        async with cache_manager.redis_client.pipeline(transaction=False) as pipe:
+            for (key, member), count in counts.items():
+                pipe.zincrby(key, count, member)
+            for field, count in served.items():
+                pipe.hincrby(self.served_key, field, count)
+            await pipe.execute()
+
+    def _served_since_flush(self) -> Counter:
+        current = Counter({
+            f"{name}:{result}": count
+            for name, cache in self.RESPONSE_CACHES.items()
+            for result, count in cache.stats().items()
+        })
+        served = current - self._served_reported
+        self._served_reported = current
+        return served
+
+    async def warm(self):
+        redis = cache_manager.redis_client
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.zrevrange(self.terms_key, 0, self.top_terms - 1)
+            pipe.zrevrange(self.products_key, 0, self.top_products - 1)
+            terms, products = await pipe.execute()
+
+        spent = 0
+        refreshed = 0
+        failed = 0
+        for member in terms:
+            if spent >= self.request_budget:
+                break
+            entry = orjson.loads(member)
+            term, options = entry["term"], entry["options"]
+            try:
+                loaded = await search_response_cache.refresh_if_expiring(
+                    search_cache_key(term, options),
+                    lambda: SearchService.search_products(query=term, refresh=True, **options),
+                    self.lead,
+                )
+            except Exception as e:
+                # Uma falha (ex.: circuito aberto) não interrompe o ciclo: o decaimento e o relatório ainda rodam.
+                logger.warning("Cache warmer failed to refresh search %s: %s", term, e)
+                failed += 1
+                continue
+            if loaded is not None:
+                refreshed += 1
+                spent += max(loaded.data["total_pages"], 1) if isinstance(loaded.data, dict) else 1
+
+        for member in products:
+            if spent >= self.request_budget:
+                break
+            entry = orjson.loads(member)
+            try:
+                loaded = await self.PRODUCT_CACHES[entry["kind"]].refresh_if_expiring(
+                    entry["id"], self._product_loader(entry["kind"], entry["id"]), self.lead
+                )
+            except Exception as e:
+                logger.warning("Cache warmer failed to refresh %s %s: %s", entry["kind"], entry["id"], e)
+                failed += 1
+                continue
+            if loaded is not None:
+                refreshed += 1
+                spent += 1
+
+        # Decaimento das frequências, para que termos que saíram de alta deixem de ser aquecidos.
+        async with redis.pipeline(transaction=False) as pipe:
+            for key in (self.terms_key, self.products_key):
+                pipe.zunionstore(key, {key: 0.5})
+                pipe.zremrangebyscore(key, "-inf", 0.5)
+            await pipe.execute()
+
+        logger.info(
+            "Cache warmer refreshed %s entries (%s failed) using ~%s upstream requests; %s",
+            refreshed, failed, spent, await self.stats(),
+        )
+
+    @staticmethod
+    def _product_loader(kind: str, product_id: int):
+        if kind == "stores":
+            return lambda: ProductSearchService.get_product_offers(product_id, refresh=True)
+        if kind == "full":
+            return lambda: ProductSearchService.get_product_full(product_id, refresh=True)
+        return lambda: ProductSearchService.get_product_details(product_id, refresh=True)
+
+    async def stats(self) -> dict:
+        """
+        Share of requests answered from cache (fresh or stale) per endpoint, across every API worker, since the
+        previous report.
+        """
+        async with cache_manager.redis_client.pipeline(transaction=True) as pipe:
+            pipe.hgetall(self.served_key)
+            pipe.delete(self.served_key)
+            served, _ = await pipe.execute()
+        counts = {field.decode("utf-8"): int(count) for field, count in served.items()}
+
+        stats = {}
+        for name in self.RESPONSE_CACHES:
+            warm = counts.get(f"{name}:hits", 0) + counts.get(f"{name}:stale_hits", 0)
+            total = warm + counts.get(f"{name}:misses", 0)
+            stats[name] = round(warm / total, 3) if total else None
+        return stats
+
+
+cache_warmer = CacheWarmer(
+    mode=settings.cache_warmer_mode,
+    interval=settings.cache_warmer_interval,
+    top_terms=settings.cache_warmer_top_terms,
+    top_products=settings.cache_warmer_top_products,
+    request_budget=settings.cache_warmer_request_budget,
+    lead=settings.cache_warmer_lead,
+)
+
+
+async def main():
+    """
+    Entry point to run the warmer as a separate worker: python -m app.services.cache_warmer
+    """
+    await cache_manager.init_cache()
+    await http_client.init_client()
+    await parser_pool.start()
+    try:
+        await cache_warmer.run(warm=True)
+    finally:
+        parser_pool.shutdown()
+        await http_client.close_client()
+        await cache_manager.close_cache()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,132 @@
+import asyncio
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from app.core.database import SessionLocal
+from app.core.logs import logger
+from app.models.offer import OfferChange, OfferState
+
+
+class PriceHistoryService:
+    """
+    Histórico de ofertas por produto e loja. Grava apenas as mudanças entre um scraping e o seguinte.
+    """
+
+    @classmethod
+    async def record_offers(cls, product_id: int, offers: list[dict]) -> int:
+        """
+        Compare the scraped offers with the last known ones and store only the differences.
+        :param product_id:
+        :param offers:
+        :return: number of changes recorded
+        """
+        try:
+            try:
+                return await asyncio.to_thread(cls._record_offers, product_id, offers)
+            except IntegrityError:
+                # Outro scraping do mesmo produto (ex.: /stores e /full juntos) gravou o estado primeiro;
+                # a nova tentativa compara com ele.
+                return await asyncio.to_thread(cls._record_offers, product_id, offers)
+        except Exception as e:
+            logger.error("Failed to record offer history for product id %s: %s", product_id, e)
+            return 0
+
+    @classmethod
+    def _record_offers(cls, product_id: int, offers: list[dict]) -> int:
+        current = {}
+        for offer in offers:
+            store_name = offer.get("store_name") or offer.get("purchase_link")
+            if not store_name:
+                continue
+            # A mesma loja pode aparecer mais de uma vez; o histórico acompanha a menor oferta dela.
+            known = current.get(store_name)
+            if known is None or cls._is_cheaper(offer.get("price"), known.get("price")):
+                current[store_name] = offer
+
+        with SessionLocal.begin() as session:
+            states = {
+                state.store_name: state
+                for state in session.scalars(select(OfferState).where(OfferState.product_id == product_id))
+            }
+            changes = []
+
+            for store_name, offer in current.items():
+                state = states.pop(store_name, None)
+                if state is None:
+                    session.add(OfferState(
+                        product_id=product_id, store_name=store_name,
+                        price=offer.get("price"), purchase_link=offer["purchase_link"],
+                    ))
+                    changes.append(OfferChange(
+                        product_id=product_id, store_name=store_name, change_type="added",
+                        price=offer.get("price"), purchase_link=offer["purchase_link"],
+                    ))
+                elif state.price != offer.get("price"):
+                    changes.append(OfferChange(
+                        product_id=product_id, store_name=store_name, change_type="changed",
+                        price=offer.get("price"), previous_price=state.price, purchase_link=offer["purchase_link"],
+                    ))
+                    state.price = offer.get("price")
+                    state.purchase_link = offer["purchase_link"]
+
+            for store_name, state in states.items():
+                changes.append(OfferChange(
+                    product_id=product_id, store_name=store_name, change_type="removed",
+                    previous_price=state.price, purchase_link=state.purchase_link,
+                ))
+                session.delete(state)
+
+            session.add_all(changes)
+            return len(changes)
+
+    @staticmethod
+    def _as_utc(value: datetime) -> datetime:
+        """The SQLite driver drops the timezone; every timestamp is stored in UTC."""
+        return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+    @staticmethod
+    def _is_cheaper(price: float | None, other: float | None) -> bool:
+        return price is not None and (other is None or price < other)
+
+    @classmethod
+    async def get_changes(cls, product_id: int, since: datetime = None, version: int = None) -> dict:
+        """
+        Get the offer changes recorded after a timestamp or a version token, without scraping.
+        :param product_id:
+        :param since:
+        :param version:
+        :return:
+        """
+        return await asyncio.to_thread(cls._get_changes, product_id, since, version)
+
+    @classmethod
+    def _get_changes(cls, product_id: int, since: datetime = None, version: int = None) -> dict:
+        query = select(OfferChange).where(OfferChange.product_id == product_id).order_by(OfferChange.id)
+        if version is not None:
+            query = query.where(OfferChange.id > version)
+        if since is not None:
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            query = query.where(OfferChange.recorded_at > since.astimezone(timezone.utc))
+
+        with SessionLocal() as session:
+            changes = list(session.scalars(query))
+
+        return {
+            "product_id": product_id,
+            "version": changes[-1].id if changes else version,
+            "changes": [
+                {
+                    "version": change.id,
+                    "store_name": change.store_name,
+                    "change_type": change.change_type,
+                    "price": change.price,
+                    "previous_price": change.previous_price,
+                    "purchase_link": change.purchase_link,
+                    "recorded_at": cls._as_utc(change.recorded_at),
+                }
+                for change in changes
+            ],
+        }
@@ -1,36 +1,100 @@
+from datetime import datetime
+
 from app.core.logs import logger
 from app.scrapers.backend import ScraperBackend
+from app.services.price_history_service import PriceHistoryService
 
 
 class ProductSearchService:
     @classmethod
-    async def get_product_details(cls, product_id: int):
+    async def get_product_details(cls, product_id: int, refresh: bool = False):
         """
         Get product details from the scraper.
         :param product_id:
+        :param refresh: re-download the product page even if it is cached
         :return:
         """
-        logger.info(f"Getting product details for product id: {product_id}")
+        logger.info("Getting product details for product id: %s", product_id, extra={"sample": True})
 
         scraper = ScraperBackend("details")
-        product_details = await scraper.execute(product_id)
+        product_details = await scraper.execute(product_id, refresh=refresh)
         if not product_details:
-            logger.warning(f"No details found for product id: {product_id}")
+            logger.warning("No details found for product id: %s", product_id)
             return None
         return product_details
 
     @classmethod
-    async def get_product_offers(cls, product_id: int) -> list[dict]:
+    async def get_product_offers(cls, product_id: int, refresh: bool = False) -> list[dict]:
         """
         Get product offers from the scraper.
         :param product_id:
+        :param refresh: re-download the product page even if it is cached
         :return:
         """
-        logger.info(f"Getting product offers for product id: {product_id}")
+        logger.info("Getting product offers for product id: %s", product_id, extra={"sample": True})
 
-        scraper = ScraperBackend("offers")
-        product_offers = await scraper.execute(product_id)
+        scraper = ScraperBackend("offers", on_result=lambda offers: cls._record_offers(product_id, offers))
+        product_offers = await scraper.execute(product_id, refresh=refresh)
         if not product_offers:
-            logger.warning(f"No stores found for product id: {product_id}")
+            logger.warning("No stores found for product id: %s", product_id)
             return []
         return product_offers
+
+    @classmethod
+    async def get_product_full(cls, product_id: int, refresh: bool = False) -> dict | None:
+        """
+        Get product details and offers from a single fetch of the product page.
+        :param product_id:
+        :param refresh: re-download the product page even if it is cached
+        :return:
+        """
+        logger.info("Getting full product view for product id: %s", product_id, extra={"sample": True})
+
+        scraper = ScraperBackend(
+            "full", on_result=lambda page: cls._record_offers(product_id, page["offers"] if page else None)
+        )
+        product_page = await scraper.execute(product_id, refresh=refresh)
+        if not product_page or not (product_page["details"] or product_page["offers"]):
+            logger.warning("No data found for product id: %s", product_id)
+            return None
+        return product_page
+
+    @classmethod
+    async def get_products_batch(cls, product_ids: list[int], fields: list[str]) -> list[dict]:
+        """
+        Get details and/or offers for many products in a single scrape.
+        :param product_ids:
+        :param fields:
+        :return:
+        """
+        product_ids = list(dict.fromkeys(product_ids))
+        logger.info("Getting %s for %s products in batch", fields, len(product_ids), extra={"sample": True})
+
+        scraper = ScraperBackend("batch", on_result=cls._record_batch_offers)
+        return await scraper.execute(product_ids, fields=tuple(fields))
+
+    @staticmethod
+    async def _record_offers(product_id: int, offers: list[dict] | None):
+        """Record the offer history of one scrape; runs once per coalesced scrape, not once per caller."""
+        if offers:
+            await PriceHistoryService.record_offers(product_id, offers)
+
+    @classmethod
+    async def _record_batch_offers(cls, results: list[dict]):
+        for result in results:
+            await cls._record_offers(result["id"], result.get("offers"))
+
+    @classmethod
+    async def get_offer_changes(cls, product_id: int, since: datetime = None, version: int = None) -> dict:
+        """
+        Get the offer changes recorded for a product since a timestamp or version token.
+        :param product_id:
+        :param since:
+        :param version:
+        :return:
+        """
+        logger.info(
+            "Getting offer changes for product id: %s since=%s version=%s", product_id, since, version,
+            extra={"sample": True},
+        )
+        return await PriceHistoryService.get_changes(product_id, since=since, version=version)
@@ -5,13 +5,26 @@ from app.scrapers.backend import ScraperBackend
 
 class SearchService:
     @classmethod
-    async def search_products(cls, query: str) -> list[ProductSummary]:
-        """Search all products in Zoom using the provided query."""
-        logger.info(f"Searching for products with query: {query}")
+    async def search_products(cls, query: str, **options) -> list[ProductSummary]:
+        """
+        Search products in Zoom using the provided query.
+        options (page, limit, sort_by, hits_per_page) restrict which pages are crawled; without them every page is.
+        refresh=True re-crawls pages that are still in the per-page cache.
+        """
+        logger.info("Searching for products with query: %s %s", query, options, extra={"sample": True})
 
         scraper = ScraperBackend("search")
-        raw_products = await scraper.execute(query)
+        raw_products = await scraper.execute(query, **options)
         if not raw_products:
-            logger.warning(f"No products found for query: {query}")
+            logger.warning("No products found for query: %s", query)
             return []
         return raw_products
+
+    @classmethod
+    async def stream_products(cls, query: str, **options):
+        """Search products in Zoom, yielding each page of products as soon as it is parsed."""
+        logger.info("Streaming products with query: %s %s", query, options, extra={"sample": True})
+
+        scraper = ScraperBackend("search")
+        async for page_products in scraper.stream(query, **options):
+            yield page_products
@@ -1,4 +1,5 @@
-from typing import Optional, Dict, Any
+import json
+from typing import Optional, Dict, Any, Iterator, List
 
 import requests
 
@@ -18,9 +19,39 @@ class APIClient:
         except requests.exceptions.RequestException as e:
             return None
 
-    def fetch_all_products(self, term: str) -> Optional[Dict[str, Any]]:
-        """Fetch all products from the API"""
-        return self.get(f"api/v1/search?term={term}")
+    def fetch_all_products(self, term: str, page: int = None, limit: int = None) -> Optional[Dict[str, Any]]:
+        """Fetch all products from the API, or only the given page / first `limit` products"""
+        query = f"term={term}"
+        if page is not None:
+            query += f"&page={page}"
+        if limit is not None:
+            query += f"&limit={limit}"
+        return self.get(f"api/v1/search?{query}")
+
+    def post(self, endpoint: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Realiza uma requisição POST com corpo JSON para a API"""
+        try:
+            response = requests.post(f"{self.base_url}/{endpoint}", json=payload)
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            return None
+
+    def stream_products(self, term: str) -> Iterator[Dict[str, Any]]:
+        """
+        Stream products from the API as NDJSON, yielding each record as soon as it arrives.
+        O último registro traz `total_pages`/`total_products`; um registro com `error` indica falha no meio da busca.
+        """
+        try:
+            with requests.get(
+                    f"{self.base_url}/api/v1/search/stream", params={"term": term, "format": "ndjson"}, stream=True
+            ) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if line:
+                        yield json.loads(line)
+        except requests.exceptions.RequestException as e:
+            yield {"error": str(e)}
 
     def fetch_product_by_id(self, product_id: int) -> Optional[Dict[str, Any]]:
         """Fetch a product by ID from the API"""
@@ -29,3 +60,20 @@ class APIClient:
     def fetch_product_by_id_stores(self, product_id: int) -> Optional[Dict[str, Any]]:
         """Fetch a product by ID and its prices in other stores from the API"""
         return self.get(f"api/v1/product/{product_id}/stores")
+
+    def fetch_products_batch(self, product_ids: List[int], fields: List[str] = None,
+                             batch_size: int = 500) -> Optional[List[Dict[str, Any]]]:
+        """
+        Fetch details and/or offers for many products, sending up to batch_size IDs per request.
+        Retorna um resultado por ID (com `error` para os que falharam) ou None se alguma requisição falhar.
+        """
+        fields = fields or ["details", "offers"]
+        results = []
+        for start in range(0, len(product_ids), batch_size):
+            response = self.post(
+                "api/v1/products/batch", {"ids": product_ids[start:start + batch_size], "fields": fields}
+            )
+            if response is None:
+                return None
+            results.extend(response["results"])
+        return results
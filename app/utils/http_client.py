@@ -1,12 +1,183 @@
+import asyncio
+import hashlib
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
 import httpx
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_exponential
+
+from app.core.cache import cache_manager
+from app.core.config import settings
+from app.core.metrics import CACHE_LOOKUPS, UPSTREAM_FETCH_SECONDS
+from app.core.tracing import span
+from app.utils.rate_limiter import circuit_breaker, rate_limiter
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+THROTTLE_STATUS_CODES = {429, 503}
 
 
+def is_retryable(exc: BaseException) -> bool:
+    """Retry on transport failures and on upstream status codes that are usually transient."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRY_STATUS_CODES
+    return isinstance(exc, httpx.TransportError)
 
-async def fetch_url(base_url: str) -> str:
+
+class HTTPClient:
     """
-    Constrói a URL completa a partir do base_url e detail_url_bytes e realiza a requisição HTTP.
+    Cliente HTTP compartilhado, com pool de conexões e keep-alive.
+    Criado e fechado no lifespan da aplicação, ao lado do cache_manager.
     """
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url=base_url, headers={"User-Agent": "Mozilla/5.0"})
-        response.raise_for_status()
+
+    def __init__(self, max_connections: int, max_keepalive_connections: int, keepalive_expiry: float,
+                 http2: bool, timeout: float, retries: int, backoff: float, max_connections_per_host: int,
+                 cache_ttl: int, cache_max_bytes: int):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_connections_per_host = max_connections_per_host
+        self.cache_ttl = cache_ttl
+        self.cache_max_bytes = cache_max_bytes
+        self.client = None
+        self._host_semaphores: dict[str, asyncio.Semaphore] = {}
+
+    async def init_client(self):
+        """
+        Initialize the pooled httpx client.
+        """
+        self.client = httpx.AsyncClient(
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(self.timeout),
+            follow_redirects=True,
+            headers={"User-Agent": "Mozilla/5.0"},
+        )
+
+    async def close_client(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def fetch_url(self, url: str) -> str:
+        """
+        Realiza a requisição HTTP reutilizando as conexões do pool, com retry e backoff exponencial.
+        Cada host tem limite de concorrência, taxa adaptativa compartilhada entre os workers e circuit breaker;
+        com o circuito aberto, levanta CircuitOpenError sem chamar o upstream.
+
+        Páginas respondidas com ETag/Last-Modified ficam guardadas (comprimidas) junto com os validadores; nas
+        próximas requisições eles são enviados em If-None-Match/If-Modified-Since e um 304 devolve a cópia guardada.
+        """
+        if self.client is None:
+            await self.init_client()
+
+        host = httpx.URL(url).host
+        cache_key = self.cache_key(url)
+        cached = await cache_manager.get_object_value(cache_key) if cache_manager.redis_client else None
+        headers = {}
+        if cached:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        # Nada pode falhar entre liberar a chamada de teste do circuito e o try que a encerra.
+        circuit_breaker.before_request(host)
+        try:
+            async for attempt in AsyncRetrying(
+                    retry=retry_if_exception(is_retryable),
+                    stop=stop_after_attempt(self.retries),
+                    wait=wait_exponential(multiplier=self.backoff),
+                    reraise=True,
+            ):
+                with attempt, span("upstream.fetch", host=host, attempt=attempt.retry_state.attempt_number):
+                    response = await self._get(url, host, headers)
+        except asyncio.CancelledError:
+            circuit_breaker.cancel_trial(host)
+            raise
+        except Exception as e:
+            if is_retryable(e):
+                circuit_breaker.record_failure(host)
+            else:
+                circuit_breaker.record_success(host)
+            raise
+
+        circuit_breaker.record_success(host)
+        if response.status_code == 304 and cached:
+            CACHE_LOOKUPS.labels("upstream", "not_modified").inc()
+            await cache_manager.redis_client.expire(cache_key, self.cache_ttl)
+            return cached["body"]
+        if cached:
+            CACHE_LOOKUPS.labels("upstream", "modified").inc()
+
+        await self._store(cache_key, response)
         return response.text
+
+    async def _store(self, cache_key: str, response: httpx.Response):
+        etag = response.headers.get("etag")
+        last_modified = response.headers.get("last-modified")
+        if cache_manager.redis_client is None or not (etag or last_modified):
+            return
+        if len(response.content) > self.cache_max_bytes:
+            return
+        await cache_manager.set_object_value(
+            cache_key, {"etag": etag, "last_modified": last_modified, "body": response.text}, expire=self.cache_ttl
+        )
+
+    @staticmethod
+    def cache_key(url: str) -> str:
+        return f"{settings.redis_prefix}:upstream:{hashlib.sha1(url.encode('utf-8')).hexdigest()}"
+
+    async def _get(self, url: str, host: str, headers: dict = None) -> httpx.Response:
+        semaphore = self._host_semaphores.setdefault(host, asyncio.Semaphore(self.max_connections_per_host))
+        async with semaphore:
+            await rate_limiter.acquire(host)
+            started = time.perf_counter()
+            try:
+                response = await self.client.get(url=url, headers=headers)
+            except httpx.TransportError:
+                UPSTREAM_FETCH_SECONDS.labels(host, "error").observe(time.perf_counter() - started)
+                await rate_limiter.penalize(host)
+                raise
+            UPSTREAM_FETCH_SECONDS.labels(host, str(response.status_code)).observe(time.perf_counter() - started)
+
+        if response.status_code in THROTTLE_STATUS_CODES:
+            await rate_limiter.penalize(host, parse_retry_after(response.headers.get("retry-after")))
+        if response.status_code != 304:
+            response.raise_for_status()
+        await rate_limiter.reward(host)
+        return response
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header given either in seconds or as an HTTP date."""
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+http_client = HTTPClient(
+    max_connections=settings.http_max_connections,
+    max_keepalive_connections=settings.http_max_keepalive_connections,
+    keepalive_expiry=settings.http_keepalive_expiry,
+    http2=settings.http_http2,
+    timeout=settings.http_timeout,
+    retries=settings.http_retries,
+    backoff=settings.http_backoff,
+    max_connections_per_host=settings.http_max_connections_per_host,
+    cache_ttl=settings.upstream_cache_ttl,
+    cache_max_bytes=settings.upstream_cache_max_bytes,
+)
@@ -0,0 +1,171 @@
+import asyncio
+import time
+
+from app.core.cache import cache_manager
+from app.core.config import settings
+from app.core.logs import logger
+
+# Token bucket compartilhado entre os workers. Retorna 0 quando o token foi consumido, ou quantos milissegundos
+# esperar antes de tentar de novo (também enquanto o host estiver pausado por um Retry-After).
+ACQUIRE_SCRIPT = """
+local pause = redis.call("pttl", KEYS[3])
+if pause > 0 then
+    return pause
+end
+local time = redis.call("time")
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local rate = tonumber(redis.call("get", KEYS[2])) or tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local bucket = redis.call("hmget", KEYS[1], "tokens", "ts")
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + (now - ts) * rate / 1000)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = math.ceil((1 - tokens) * 1000 / rate)
+end
+redis.call("hset", KEYS[1], "tokens", tostring(tokens), "ts", now)
+redis.call("pexpire", KEYS[1], 60000)
+return wait
+"""
+
+# Ajuste AIMD da taxa: multiplica por ARGV[1] e soma ARGV[2], dentro de [ARGV[3], ARGV[4]].
+ADJUST_SCRIPT = """
+local rate = tonumber(redis.call("get", KEYS[1])) or tonumber(ARGV[5])
+rate = rate * tonumber(ARGV[1]) + tonumber(ARGV[2])
+rate = math.max(tonumber(ARGV[3]), math.min(tonumber(ARGV[4]), rate))
+redis.call("set", KEYS[1], tostring(rate), "EX", 3600)
+return tostring(rate)
+"""
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream host whose circuit breaker is open."""
+
+    def __init__(self, host: str, retry_after: float):
+        super().__init__(f"Upstream {host} is unavailable, retry in {int(retry_after)}s")
+        self.host = host
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """
+    Limitador de requisições por host, compartilhado entre os workers via Redis.
+
+    A taxa se adapta ao upstream (AIMD): cresce `increase` req/s a cada `increase_every` respostas bem-sucedidas
+    neste worker e cai pela metade a cada 429/503 ou falha de rede. Um `Retry-After` pausa o host para todos os
+    workers. Sem Redis inicializado, o limitador não restringe nada.
+    """
+
+    def __init__(self, initial_rate: float, min_rate: float, max_rate: float, burst: int,
+                 increase: float, increase_every: int):
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.increase_every = increase_every
+        self._successes: dict[str, int] = {}
+        self._last_penalty: dict[str, float] = {}
+
+    def _keys(self, host: str) -> list[str]:
+        prefix = f"{settings.redis_prefix}:ratelimit:{host}"
+        return [f"{prefix}:bucket", f"{prefix}:rate", f"{prefix}:pause"]
+
+    async def acquire(self, host: str):
+        redis = cache_manager.redis_client
+        if redis is None:
+            return
+        while True:
+            wait = await redis.eval(ACQUIRE_SCRIPT, 3, *self._keys(host), self.initial_rate, self.burst)
+            if not wait:
+                return
+            await asyncio.sleep(int(wait) / 1000)
+
+    async def reward(self, host: str):
+        self._successes[host] = self._successes.get(host, 0) + 1
+        if self._successes[host] >= self.increase_every:
+            self._successes[host] = 0
+            await self._adjust(host, 1, self.increase)
+
+    async def penalize(self, host: str, retry_after: float = None):
+        self._successes[host] = 0
+        redis = cache_manager.redis_client
+        if redis is not None and retry_after:
+            await redis.set(self._keys(host)[2], 1, px=int(retry_after * 1000))
+
+        # Uma rajada de respostas 429 simultâneas conta como um único sinal de sobrecarga.
+        now = time.monotonic()
+        if now - self._last_penalty.get(host, 0) < 1:
+            return
+        self._last_penalty[host] = now
+        rate = await self._adjust(host, 0.5, 0)
+        logger.warning("Upstream %s throttled, rate lowered to %s req/s (retry-after=%s)", host, rate, retry_after)
+
+    async def _adjust(self, host: str, factor: float, increment: float) -> float | None:
+        redis = cache_manager.redis_client
+        if redis is None:
+            return None
+        # O script devolve a taxa como string (bytes sem decode_responses).
+        rate = await redis.eval(
+            ADJUST_SCRIPT, 1, self._keys(host)[1],
+            factor, increment, self.min_rate, self.max_rate, self.initial_rate,
+        )
+        return float(rate)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker por host, por worker. Após `failure_threshold` falhas seguidas o circuito abre e as chamadas
+    falham imediatamente com CircuitOpenError por `reset_timeout` segundos; depois, uma chamada de teste é liberada
+    e fecha o circuito se tiver sucesso.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures: dict[str, int] = {}
+        self._opened_at: dict[str, float] = {}
+        self._trial_in_flight: set[str] = set()
+
+    def before_request(self, host: str):
+        opened_at = self._opened_at.get(host)
+        if opened_at is None:
+            return
+        remaining = opened_at + self.reset_timeout - time.monotonic()
+        if remaining > 0 or host in self._trial_in_flight:
+            raise CircuitOpenError(host, max(remaining, 1))
+        self._trial_in_flight.add(host)
+
+    def cancel_trial(self, host: str):
+        self._trial_in_flight.discard(host)
+
+    def record_success(self, host: str):
+        self._failures[host] = 0
+        self._trial_in_flight.discard(host)
+        if self._opened_at.pop(host, None) is not None:
+            logger.info("Circuit for %s closed", host)
+
+    def record_failure(self, host: str):
+        self._failures[host] = self._failures.get(host, 0) + 1
+        self._trial_in_flight.discard(host)
+        if host in self._opened_at or self._failures[host] >= self.failure_threshold:
+            self._opened_at[host] = time.monotonic()
+            logger.warning("Circuit for %s opened after %s failures", host, self._failures[host])
+
+
+rate_limiter = RateLimiter(
+    initial_rate=settings.rate_limit_initial,
+    min_rate=settings.rate_limit_min,
+    max_rate=settings.rate_limit_max,
+    burst=settings.rate_limit_burst,
+    increase=settings.rate_limit_increase,
+    increase_every=settings.rate_limit_increase_every,
+)
+
+circuit_breaker = CircuitBreaker(
+    failure_threshold=settings.circuit_failure_threshold,
+    reset_timeout=settings.circuit_reset_timeout,
+)
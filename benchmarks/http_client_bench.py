@@ -0,0 +1,92 @@
+"""
+Requests per second of the shared, pooled HTTPClient against the previous one-client-per-call fetch_url.
+
+    python -m benchmarks.mock_upstream --port 9000 --latency 0 --jitter 0
+    python -m benchmarks.http_client_bench --url http://127.0.0.1:9000/produto/1 --requests 2000 --concurrency 50
+
+Both clients download the same page `--requests` times, `--concurrency` at a time. Redis is left out (the rate
+limiter and the conditional GET cache are skipped without it), so the difference is the connection handling: a new
+TCP (and TLS, for https) handshake per request against keep-alive connections reused from the pool.
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+import httpx
+
+from app.core.config import settings
+from app.utils.http_client import HTTPClient
+from benchmarks.load_driver import percentile
+
+
+async def fetch_url_per_call(url: str) -> str:
+    """fetch_url before the shared client: a new AsyncClient, and connection, for every request."""
+    async with httpx.AsyncClient() as client:
+        response = await client.get(url=url, headers={"User-Agent": "Mozilla/5.0"})
+        response.raise_for_status()
+        return response.text
+
+
+async def measure(fetch, url: str, requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def send():
+        async with semaphore:
+            started = time.perf_counter()
+            await fetch(url)
+            latencies.append(time.perf_counter() - started)
+
+    await fetch(url)
+    started = time.perf_counter()
+    await asyncio.gather(*(send() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    return {
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+    }
+
+
+async def run(args) -> dict:
+    client = HTTPClient(
+        max_connections=args.concurrency,
+        max_keepalive_connections=args.concurrency,
+        keepalive_expiry=settings.http_keepalive_expiry,
+        http2=settings.http_http2,
+        timeout=settings.http_timeout,
+        retries=1,
+        backoff=settings.http_backoff,
+        max_connections_per_host=args.concurrency,
+        cache_ttl=settings.upstream_cache_ttl,
+        cache_max_bytes=settings.upstream_cache_max_bytes,
+    )
+    await client.init_client()
+    try:
+        return {
+            "per_call": await measure(fetch_url_per_call, args.url, args.requests, args.concurrency),
+            "pooled": await measure(client.fetch_url, args.url, args.requests, args.concurrency),
+        }
+    finally:
+        await client.close_client()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Compare per-call and pooled HTTP clients.")
+    arg_parser.add_argument("--url", default="http://127.0.0.1:9000/produto/1")
+    arg_parser.add_argument("--requests", type=int, default=2000)
+    arg_parser.add_argument("--concurrency", type=int, default=50)
+    args = arg_parser.parse_args()
+
+    # One log line per request would dominate the measurement.
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    results = asyncio.run(run(args))
+    print(f"{'client':<10} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, row in results.items():
+        print(f"{name:<10} {row['rps']:>8} {row['p50_ms']:>8} {row['p99_ms']:>8}")
+    print(f"speedup: {results['pooled']['rps'] / results['per_call']['rps']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Open-loop load driver for the API: sends requests at a fixed rate, whatever the response times, and reports the
+throughput and the p50/p95/p99 latency per endpoint.
+
+    python -m benchmarks.load_driver --url http://localhost:8000 --rps 50 --duration 60
+
+`--terms` and `--products` set how many distinct search terms and product ids are drawn, which controls the cache
+hit ratio; `--mix` sets the share of each endpoint. Point the API at benchmarks.mock_upstream to keep zoom.com.br
+out of the test.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+
+import httpx
+
+ENDPOINTS = {
+    "search": lambda rng, args: f"/api/v1/search?term=termo-{rng.randrange(args.terms)}",
+    "product": lambda rng, args: f"/api/v1/product/{args.first_product + rng.randrange(args.products)}",
+    "stores": lambda rng, args: f"/api/v1/product/{args.first_product + rng.randrange(args.products)}/stores",
+}
+
+
+def percentile(values: list[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * percent / 100), len(values) - 1)]
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    mix = {}
+    for item in value.split(","):
+        name, weight = item.split("=")
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint '{name}'; expected one of {', '.join(ENDPOINTS)}.")
+        mix[name] = float(weight)
+    return mix
+
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+    names, weights = zip(*args.mix.items())
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    tasks = []
+
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+
+        async def send(name: str, path: str):
+            started = time.perf_counter()
+            try:
+                response = await client.get(path)
+                ok = response.status_code < 500
+            except httpx.HTTPError:
+                ok = False
+            latencies[name].append(time.perf_counter() - started)
+            if not ok:
+                errors[name] += 1
+
+        started = time.perf_counter()
+        for index in range(int(args.rps * args.duration)):
+            # Requests go out on schedule; a slow API shows up as latency instead of a lower send rate.
+            delay = started + index / args.rps - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            name = rng.choices(names, weights)[0]
+            tasks.append(asyncio.create_task(send(name, ENDPOINTS[name](rng, args))))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    report = {"target_rps": args.rps, "elapsed": round(elapsed, 2), "endpoints": {}}
+    for name in names:
+        values = latencies[name]
+        report["endpoints"][name] = {
+            "requests": len(values),
+            "errors": errors[name],
+            "rps": round(len(values) / elapsed, 1),
+            "p50_ms": round(percentile(values, 50) * 1000, 1),
+            "p95_ms": round(percentile(values, 95) * 1000, 1),
+            "p99_ms": round(percentile(values, 99) * 1000, 1),
+        }
+    all_values = [value for values in latencies.values() for value in values]
+    report["total"] = {
+        "requests": len(all_values),
+        "errors": sum(errors.values()),
+        "rps": round(len(all_values) / elapsed, 1),
+        "p50_ms": round(percentile(all_values, 50) * 1000, 1),
+        "p95_ms": round(percentile(all_values, 95) * 1000, 1),
+        "p99_ms": round(percentile(all_values, 99) * 1000, 1),
+    }
+    return report
+
+
+def print_report(report: dict):
+    print(f"target {report['target_rps']} req/s over {report['elapsed']}s")
+    print(f"{'endpoint':<10} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, row in [*report["endpoints"].items(), ("total", report["total"])]:
+        print(f"{name:<10} {row['requests']:>9} {row['errors']:>7} {row['rps']:>8} "
+              f"{row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Drive the API at a target request rate.")
+    arg_parser.add_argument("--url", default="http://localhost:8000")
+    arg_parser.add_argument("--rps", type=float, default=20, help="Target requests per second.")
+    arg_parser.add_argument("--duration", type=float, default=30, help="Seconds of load.")
+    arg_parser.add_argument("--mix", type=parse_mix, default="search=0.4,product=0.3,stores=0.3")
+    arg_parser.add_argument("--terms", type=int, default=50, help="Distinct search terms.")
+    arg_parser.add_argument("--products", type=int, default=500, help="Distinct product ids.")
+    arg_parser.add_argument("--first-product", type=int, default=1000000)
+    arg_parser.add_argument("--connections", type=int, default=200)
+    arg_parser.add_argument("--timeout", type=float, default=30)
+    arg_parser.add_argument("--seed", type=int, default=1)
+    arg_parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = arg_parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
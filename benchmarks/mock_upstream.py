@@ -0,0 +1,96 @@
+"""
+Local stand-in for zoom.com.br, serving the fixture corpus, to load-test the API without touching the real site.
+
+    python -m benchmarks.mock_upstream --port 9000 --pages 5 --latency 0.2 --error-rate 0.01
+
+Then start the API with BASE_URL=http://localhost:9000 and PRODUCT_URL_FALLBACK=/produto/{product_id} (so products
+that never appeared in a search still resolve). /search serves `--pages` pages of the search fixture, with product
+ids that depend on the query and the page; every other path serves the product fixture.
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+import re
+from pathlib import Path
+
+import uvicorn
+from fastapi import FastAPI, Request, Response
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+CARD_PATTERN = re.compile(r'<div class="Hits_ProductCard__Bonl_".*?</a></div>', re.S)
+PAGINATOR_PATTERN = re.compile(r'<nav class="Paginator_Paginator__iT2bX">.*?</nav>', re.S)
+PRODUCT_ID_PATTERN = re.compile(r"product-card-(\d+)")
+
+
+class MockUpstream:
+    def __init__(self, pages: int, latency: float, jitter: float, error_rate: float, etag: bool):
+        self.pages = pages
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.etag = etag
+        self.search_html = (FIXTURES / "search_smart_tv.html").read_text()
+        self.product_html = (FIXTURES / "product_full.html").read_text()
+        self.empty_search_html = PAGINATOR_PATTERN.sub("", CARD_PATTERN.sub("", self.search_html))
+        paginator = "".join(
+            f'<a class="Paginator_Page__vR5dE" href="/search?q=mock&amp;page={page}">{page}</a>'
+            for page in range(1, pages + 1)
+        )
+        self.search_template = PAGINATOR_PATTERN.sub(
+            f'<nav class="Paginator_Paginator__iT2bX">{paginator}</nav>', self.search_html
+        )
+
+    def search_page(self, query: str, page: int) -> str:
+        if page > self.pages:
+            return self.empty_search_html
+        # Ids stay stable for the same query and page, so repeated searches hit the same products.
+        offset = int(hashlib.sha1(query.encode("utf-8")).hexdigest()[:6], 16) * 100 + page * 1000
+        return PRODUCT_ID_PATTERN.sub(lambda match: f"product-card-{int(match.group(1)) + offset}",
+                                      self.search_template)
+
+    async def respond(self, request: Request, html: str) -> Response:
+        await asyncio.sleep(max(self.latency + random.uniform(-self.jitter, self.jitter), 0))
+        if random.random() < self.error_rate:
+            return Response(status_code=503, headers={"Retry-After": "1"})
+        if not self.etag:
+            return Response(html, media_type="text/html")
+
+        etag = f'"{hashlib.sha1(html.encode("utf-8")).hexdigest()}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(html, media_type="text/html", headers={"ETag": etag})
+
+
+def create_app(upstream: MockUpstream) -> FastAPI:
+    app = FastAPI(title="Zoom mock upstream")
+
+    @app.get("/search")
+    async def search(request: Request, q: str = "", page: int = 1):
+        return await upstream.respond(request, upstream.search_page(q, page))
+
+    @app.get("/{path:path}")
+    async def product(request: Request, path: str):
+        return await upstream.respond(request, upstream.product_html)
+
+    return app
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Serve the fixture corpus as a local Zoom stand-in.")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=9000)
+    arg_parser.add_argument("--pages", type=int, default=5, help="Result pages per search.")
+    arg_parser.add_argument("--latency", type=float, default=0.1, help="Mean response latency, in seconds.")
+    arg_parser.add_argument("--jitter", type=float, default=0.05, help="Uniform latency jitter, in seconds.")
+    arg_parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of 503 responses.")
+    arg_parser.add_argument("--etag", action="store_true", help="Send ETags and answer If-None-Match with 304.")
+    args = arg_parser.parse_args()
+
+    upstream = MockUpstream(args.pages, args.latency, args.jitter, args.error_rate, args.etag)
+    uvicorn.run(create_app(upstream), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Regression check and benchmark of the parsers over the recorded fixture corpus, fully offline.
+
+    python -m benchmarks.parser_bench                      # every engine, checks goldens and thresholds
+    python -m benchmarks.parser_bench --engine lxml        # a single engine
+    python -m benchmarks.parser_bench --update-golden      # rewrite the goldens from the current parsers
+
+For each parser, fixture and engine it checks the output against benchmarks/golden, then reports the throughput
+(pages/s), the peak memory allocated by one parse (tracemalloc) and, at the end, the peak RSS of the process.
+Fixtures that embed a __NEXT_DATA__ blob run twice, through the DOM parsers and through the embedded JSON path, and
+both must give the golden output (written from the DOM path).
+Exits with status 1 when an output differs from its golden or a result crosses benchmarks/thresholds.json.
+"""
+import argparse
+import json
+import resource
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import orjson
+
+from app.core.config import settings
+from app.scrapers import engines, next_data
+from app.scrapers.parser import parse_product_details, parse_product_offers, parse_search_page
+
+ROOT = Path(__file__).parent
+FIXTURES = ROOT / "fixtures"
+GOLDEN = ROOT / "golden"
+THRESHOLDS = ROOT / "thresholds.json"
+
+# (parser class, parse function, fixtures). The *_next fixtures embed the page state in __NEXT_DATA__ and must give
+# the same output as the DOM-only ones; in the *_partial_next ones the blob does not fit the mapping (unknown keys,
+# incomplete records) and the JSON path must fall back to the DOM.
+CASES = [
+    ("SearchParser", parse_search_page,
+     ["search_smart_tv", "search_smart_tv_next", "search_smart_tv_partial_next"]),
+    ("ProductDetailsParser", parse_product_details,
+     ["product_full", "product_full_next", "product_full_partial_next", "product_simplified"]),
+    ("ProductOffersParser", parse_product_offers,
+     ["product_full", "product_full_next", "product_full_partial_next", "product_simplified"]),
+]
+
+
+def use_engine(name: str):
+    """Make the parse functions build their trees with the given engine."""
+    settings.parser_engine = name
+    engines.get_engine.cache_clear()
+
+
+def paths(html: str) -> list[tuple[str, bool]]:
+    """(name, PARSER_EMBEDDED_JSON) of the parse paths to check for a fixture."""
+    return [("dom", False), ("json", True)] if next_data.NEXT_DATA_MARKER in html else [("dom", False)]
+
+
+def golden_path(fixture: str, func) -> Path:
+    return GOLDEN / f"{fixture}.{func.__name__}.json"
+
+
+def normalize(result):
+    """Round-trip through JSON, as the result would be cached or returned by the API (tuples become lists)."""
+    return orjson.loads(orjson.dumps(result))
+
+
+def measure(func, html: str, duration: float) -> tuple[float, float]:
+    """Return the throughput in pages/s over about `duration` seconds and the peak allocation of one parse in MB."""
+    func(html)
+    pages = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < duration:
+        func(html)
+        pages += 1
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    func(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return pages / elapsed, peak / 1024 / 1024
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KB on Linux and in bytes on macOS.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Parser regression check and benchmark.")
+    arg_parser.add_argument("--engine", action="append", choices=sorted(engines.ENGINES),
+                            help="Engine to run (repeatable); defaults to every engine.")
+    arg_parser.add_argument("--duration", type=float, default=1.0, help="Seconds of parsing per case.")
+    arg_parser.add_argument("--update-golden", action="store_true", help="Rewrite the goldens and skip the checks.")
+    args = arg_parser.parse_args()
+
+    thresholds = json.loads(THRESHOLDS.read_text())
+    failures = []
+
+    if args.update_golden:
+        use_engine("html.parser")
+        settings.parser_embedded_json = False
+        for _, func, fixtures in CASES:
+            for fixture in fixtures:
+                result = normalize(func((FIXTURES / f"{fixture}.html").read_text()))
+                golden_path(fixture, func).write_text(json.dumps(result, ensure_ascii=False, indent=2) + "\n")
+                print(f"updated {golden_path(fixture, func).relative_to(ROOT)}")
+        return
+
+    print(f"{'parser':<22} {'engine':<12} {'fixture':<28} {'path':<5} {'pages/s':>9} {'peak MB':>8}  result")
+    for engine in args.engine or list(engines.ENGINES):
+        use_engine(engine)
+        for parser_name, func, fixtures in CASES:
+            limits = thresholds["parsers"].get(parser_name, {}).get(engine, {})
+            for fixture in fixtures:
+                html = (FIXTURES / f"{fixture}.html").read_text()
+                golden = json.loads(golden_path(fixture, func).read_text())
+                for path, embedded_json in paths(html):
+                    settings.parser_embedded_json = embedded_json
+                    problems = []
+
+                    if normalize(func(html)) != golden:
+                        problems.append("output differs from golden")
+
+                    pages_per_sec, peak_mb = measure(func, html, args.duration)
+                    if pages_per_sec < limits.get("min_pages_per_sec", 0):
+                        problems.append(f"below {limits['min_pages_per_sec']} pages/s")
+                    if peak_mb > limits.get("max_peak_alloc_mb", float("inf")):
+                        problems.append(f"above {limits['max_peak_alloc_mb']} MB allocated")
+
+                    failures.extend(f"{parser_name}/{engine}/{fixture}/{path}: {problem}" for problem in problems)
+                    print(f"{parser_name:<22} {engine:<12} {fixture:<28} {path:<5} {pages_per_sec:>9.1f} "
+                          f"{peak_mb:>8.2f}  {'; '.join(problems) or 'ok'}")
+
+    rss = peak_rss_mb()
+    print(f"peak RSS: {rss:.1f} MB")
+    if rss > thresholds["max_rss_mb"]:
+        failures.append(f"peak RSS above {thresholds['max_rss_mb']} MB")
+
+    if failures:
+        print("\nFAILED:\n" + "\n".join(f"  {failure}" for failure in failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
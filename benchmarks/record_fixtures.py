@@ -0,0 +1,31 @@
+"""
+Record live Zoom pages into the fixture corpus (needs network access).
+
+    python -m benchmarks.record_fixtures search_smart_tv "/search?q=smart+tv"
+    python -m benchmarks.record_fixtures product_full "/smart-tv/samsung-55-..."
+
+Review the recorded page, then run `python -m benchmarks.parser_bench --update-golden` and check the golden diff.
+"""
+import argparse
+
+import httpx
+
+from app.core.config import settings
+from benchmarks.parser_bench import FIXTURES
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Record a Zoom page as a parser fixture.")
+    arg_parser.add_argument("name", help="Fixture name, without extension.")
+    arg_parser.add_argument("path", help="Page path on settings.base_url.")
+    args = arg_parser.parse_args()
+
+    response = httpx.get(f"{settings.base_url}{args.path}", headers={"User-Agent": "Mozilla/5.0"},
+                         follow_redirects=True, timeout=30)
+    response.raise_for_status()
+    (FIXTURES / f"{args.name}.html").write_text(response.text)
+    print(f"recorded {args.name}.html ({len(response.content)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
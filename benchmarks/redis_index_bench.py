@@ -0,0 +1,107 @@
+"""
+Redis round trips spent indexing and resolving the product URLs of a search page, before and after batching.
+
+    python -m benchmarks.redis_index_bench                   # Redis at REDIS_HOST/REDIS_PORT
+    python -m benchmarks.redis_index_bench --fake            # in-process fakeredis (pip install fakeredis)
+
+Replays, for the products of the recorded search fixture, the Redis commands each version issues:
+
+- per_product: the original loop, a GET and then a SET for every product (two serial round trips each);
+- pipelined: one pipeline with a SET per product;
+- hash: the product index, a single HSET of the whole page (and a single HMGET to resolve the URLs).
+
+Against a real Redis the difference is mostly network round trips; fakeredis only shows the client-side cost.
+"""
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from redis import asyncio as aioredis
+
+from app.core.config import settings
+
+GOLDEN = Path(__file__).parent / "golden" / "search_smart_tv.parse_search_page.json"
+
+
+def connect(fake: bool):
+    if not fake:
+        return aioredis.Redis(host=settings.redis_host, port=settings.redis_port, db=settings.redis_db)
+    try:
+        import fakeredis
+    except ImportError:
+        raise SystemExit("--fake needs fakeredis: pip install fakeredis")
+    return fakeredis.FakeAsyncRedis()
+
+
+async def timed(func, rounds: int) -> float:
+    """Mean milliseconds per call of func over rounds calls."""
+    await func()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        await func()
+    return (time.perf_counter() - started) / rounds * 1000
+
+
+async def run(args) -> dict:
+    products, _ = json.loads(GOLDEN.read_text())
+    mapping = {product["id"]: product["detail_url"] for product in products}
+    prefix = f"{settings.redis_prefix}:bench"
+    index_key = f"{prefix}:product_urls"
+    redis = connect(args.fake)
+
+    async def write_per_product():
+        for product_id, url in mapping.items():
+            if not await redis.get(f"{prefix}:{product_id}"):
+                await redis.set(f"{prefix}:{product_id}", url, ex=900)
+
+    async def write_pipelined():
+        async with redis.pipeline(transaction=False) as pipe:
+            for product_id, url in mapping.items():
+                pipe.set(f"{prefix}:{product_id}", url, ex=900)
+            await pipe.execute()
+
+    async def write_hash():
+        await redis.hset(index_key, mapping=mapping)
+
+    async def read_per_product():
+        for product_id in mapping:
+            await redis.get(f"{prefix}:{product_id}")
+
+    async def read_hash():
+        await redis.hmget(index_key, list(mapping))
+
+    try:
+        results = {
+            "write": {
+                "per_product": await timed(write_per_product, args.rounds),
+                "pipelined": await timed(write_pipelined, args.rounds),
+                "hash": await timed(write_hash, args.rounds),
+            },
+            "read": {
+                "per_product": await timed(read_per_product, args.rounds),
+                "hash": await timed(read_hash, args.rounds),
+            },
+        }
+        await redis.delete(index_key, *(f"{prefix}:{product_id}" for product_id in mapping))
+    finally:
+        await redis.close()
+    return {"products": len(mapping), **results}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark the Redis round trips of the product URL index.")
+    arg_parser.add_argument("--fake", action="store_true", help="Use an in-process fakeredis instead of Redis.")
+    arg_parser.add_argument("--rounds", type=int, default=200, help="Pages indexed per variant.")
+    args = arg_parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(f"{results['products']} products per page, mean ms per page")
+    for operation in ("write", "read"):
+        for variant, ms in results[operation].items():
+            print(f"{operation:<6} {variant:<12} {ms:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Throughput of the production server (app.server) as the number of workers grows.
+
+    python -m benchmarks.scaling --workers 1,2,4 --rps 200 --duration 30
+
+For each worker count it starts `python -m app.server` with SERVER_WORKERS set, waits until it answers, drives it
+with benchmarks.load_driver at the same target rate and stops it with SIGTERM (the graceful shutdown path). Run it
+against benchmarks.mock_upstream and a local Redis, exported in the environment as for the load test, so the
+results measure the API and not zoom.com.br.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.load_driver import parse_mix, run
+
+
+def wait_ready(url: str, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/docs", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f"Server at {url} did not start within {timeout}s")
+
+
+def measure(workers: int, args) -> dict:
+    env = {**os.environ, "SERVER_WORKERS": str(workers), "SERVER_PORT": str(args.port)}
+    server = subprocess.Popen([sys.executable, "-m", "app.server"], env=env)
+    try:
+        url = f"http://127.0.0.1:{args.port}"
+        wait_ready(url, args.startup_timeout)
+        load = argparse.Namespace(**{**vars(args), "url": url})
+        return asyncio.run(run(load))["total"]
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Measure the API throughput per number of workers.")
+    arg_parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts.")
+    arg_parser.add_argument("--port", type=int, default=8100)
+    arg_parser.add_argument("--rps", type=float, default=200, help="Target requests per second, above capacity.")
+    arg_parser.add_argument("--duration", type=float, default=30, help="Seconds of load per worker count.")
+    arg_parser.add_argument("--mix", type=parse_mix, default="search=0.4,product=0.3,stores=0.3")
+    arg_parser.add_argument("--terms", type=int, default=50)
+    arg_parser.add_argument("--products", type=int, default=500)
+    arg_parser.add_argument("--first-product", type=int, default=1000000)
+    arg_parser.add_argument("--connections", type=int, default=500)
+    arg_parser.add_argument("--timeout", type=float, default=30)
+    arg_parser.add_argument("--seed", type=int, default=1)
+    arg_parser.add_argument("--startup-timeout", type=float, default=60)
+    args = arg_parser.parse_args()
+
+    rows = [(int(workers), measure(int(workers), args)) for workers in args.workers.split(",")]
+
+    print(f"{'workers':>7} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>9} {'p99 ms':>9} {'speedup':>8}")
+    base_rps = rows[0][1]["rps"] or 1
+    for workers, row in rows:
+        print(f"{workers:>7} {row['requests']:>9} {row['errors']:>7} {row['rps']:>8} "
+              f"{row['p50_ms']:>9} {row['p99_ms']:>9} {row['rps'] / base_rps:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Bytes stored and encode/decode time of the cache serializer against plain JSON.
+
+    python -m benchmarks.serializer_bench --pages 1 --pages 5
+
+The payload is a search response (products, total_pages, total_products) built from the recorded search fixture's
+golden output, repeated `--pages` times (the repeated pages make zlib's ratio look better than on real distinct
+pages; the single page is the representative case). Compares stdlib JSON, the CacheSerializer without compression (orjson
+behind the versioned header) and the CacheSerializer with zlib at CACHE_COMPRESS_LEVEL.
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+from app.core.config import settings
+from app.core.serializers import CacheSerializer
+
+GOLDEN = Path(__file__).parent / "golden" / "search_smart_tv.parse_search_page.json"
+
+
+class PlainJson:
+    @staticmethod
+    def dumps(value) -> bytes:
+        return json.dumps(value).encode("utf-8")
+
+    @staticmethod
+    def loads(data: bytes):
+        return json.loads(data)
+
+
+SERIALIZERS = {
+    "json": PlainJson(),
+    "orjson": CacheSerializer(compress_threshold=float("inf"), compress_level=settings.cache_compress_level),
+    "orjson+zlib": CacheSerializer(compress_threshold=0, compress_level=settings.cache_compress_level),
+}
+
+
+def search_response(pages: int) -> dict:
+    products, _ = json.loads(GOLDEN.read_text())
+    products = products * pages
+    return {"products": products, "total_pages": pages, "total_products": len(products)}
+
+
+def mean_us(func, duration: float) -> float:
+    calls = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < duration:
+        func()
+        calls += 1
+    return (time.perf_counter() - started) / calls * 1_000_000
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark the cache serializer.")
+    arg_parser.add_argument("--pages", type=int, action="append", help="Search pages per payload (repeatable).")
+    arg_parser.add_argument("--duration", type=float, default=0.5, help="Seconds per measurement.")
+    args = arg_parser.parse_args()
+
+    print(f"{'pages':>5} {'serializer':<12} {'bytes':>9} {'ratio':>6} {'encode us':>10} {'decode us':>10}")
+    for pages in args.pages or [1, 5]:
+        payload = search_response(pages)
+        baseline = len(SERIALIZERS["json"].dumps(payload))
+        for name, serializer in SERIALIZERS.items():
+            data = serializer.dumps(payload)
+            assert serializer.loads(data) == payload
+            encode = mean_us(lambda: serializer.dumps(payload), args.duration)
+            decode = mean_us(lambda: serializer.loads(data), args.duration)
+            print(f"{pages:>5} {name:<12} {len(data):>9} {len(data) / baseline:>6.2f} {encode:>10.1f} {decode:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
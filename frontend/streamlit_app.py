@@ -1,4 +1,4 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 import streamlit as st
 
@@ -24,18 +24,42 @@ class StreamLitApp:
 
         st.write("### Lista de Produtos encontrados")
         for product in products:
-            with st.container():
-                st.write(f"**ID:** {product['id']}")
-                st.write(f"**Nome:** {product['name']}")
-                st.write(f"**Preço:** {product['price']}")
-                st.write(f"**Parcelas:** {product['installments']}")
-                st.write(f"**Avaliações:** {product['ratings']}")
+            self.display_product(product)
+
+    def display_product(self, product: Dict[str, Any]):
+        """Exibe um produto da lista de resultados."""
+        with st.container():
+            st.write(f"**ID:** {product['id']}")
+            st.write(f"**Nome:** {product['name']}")
+            st.write(f"**Preço:** {product['price']}")
+            st.write(f"**Parcelas:** {product['installments']}")
+            st.write(f"**Avaliações:** {product['ratings']}")
+
+            detail_url = f"{self.store_url}{product['detail_url']}"
+            st.markdown(f"[Clique aqui para mais detalhes]({detail_url})", unsafe_allow_html=True)
+            st.write(f"**Descrição:** {product['description']}")
+            st.image(product['image_url'], caption="Imagem do Produto", use_container_width=True, width=50)
+            st.divider()
+
+    def stream_products(self, search_query: str) -> Optional[List[Dict[str, Any]]]:
+        """Exibe os produtos à medida que chegam da API e retorna a lista completa ao final."""
+        products = []
+        status = st.empty()
+        st.write("### Lista de Produtos encontrados")
+        for record in self.api_client.stream_products(search_query):
+            if "error" in record:
+                st.error("Erro ao buscar produtos. Verifique a conexão com a API.")
+                return None
+            if "total_products" in record:
+                status.write(f"**{record['total_products']}** produtos em **{record['total_pages']}** páginas.")
+                continue
+            products.append(record)
+            status.write(f"Carregando... {len(products)} produtos encontrados.")
+            self.display_product(record)
 
-                detail_url = f"{self.store_url}{product['detail_url']}"
-                st.markdown(f"[Clique aqui para mais detalhes]({detail_url})", unsafe_allow_html=True)
-                st.write(f"**Descrição:** {product['description']}")
-                st.image(product['image_url'], caption="Imagem do Produto", use_container_width=True, width=50)
-                st.divider()
+        if not products:
+            st.write("### Nenhum produto encontrado ou formato inválido.")
+        return products
 
     @classmethod
     def display_product_details(cls, product: Dict[str, Any]):
@@ -85,16 +109,14 @@ class StreamLitApp:
             if not search_query:
                 st.error("Por favor, insira um termo de pesquisa.")
                 return
-            products = self.api_client.fetch_all_products(search_query)
+            products = self.stream_products(search_query)
             if products is None:
-                st.error("Erro ao buscar produtos. Verifique a conexão com a API.")
                 return
 
-            st.session_state["products"] = products.get("products", [])
+            st.session_state["products"] = products
         else:
             st.session_state.setdefault("products", [])
-
-        self.display_products(st.session_state["products"])
+            self.display_products(st.session_state["products"])
 
     def search_product_by_id_tab(self):
         """Aba para pesquisa de produto por ID."""